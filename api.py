@@ -1,27 +1,63 @@
+import atexit
+import hashlib
+import hmac
+import io
+import itertools
 import logging
 import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
+from enum import IntEnum
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 
-from flask import Flask, request, jsonify, abort
+import orjson
+from flask import Flask, request, abort
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
+from werkzeug.exceptions import BadRequest, HTTPException
 
 # Import centralized configuration
 from config import Config
 
 from youtube_client import get_video_details
-from scoring_modules import score_description, score_title, score_tags, score_category
-from data_manager import save_feedback, load_feedback
-from simple_scoring import compute_simple_score, compute_simple_score_from_title, compute_simple_score_title_and_clean_desc
-from transcript_service import get_transcript, get_transcript_excerpt
-from coach_agent import get_coach_agent
-from librarian_agent import get_librarian_agent
-from navigator_agent import get_navigator_agent
-from gatekeeper_agent import get_gatekeeper_agent
-from intent_agent import get_intent_agent
-import numpy as np
+import firestore_service as fs  # lightweight; the Firestore client itself is created on first use
+
+# --- Agents (imported on first use so workers only load what they serve) ---
+@lru_cache(maxsize=None)
+def _coach_agent():
+    from coach_agent import get_coach_agent
+    return get_coach_agent()
+
+@lru_cache(maxsize=None)
+def _librarian_agent():
+    from librarian_agent import get_librarian_agent
+    return get_librarian_agent()
+
+@lru_cache(maxsize=None)
+def _navigator_agent():
+    from navigator_agent import get_navigator_agent
+    return get_navigator_agent()
+
+@lru_cache(maxsize=None)
+def _gatekeeper_agent():
+    from gatekeeper_agent import get_gatekeeper_agent
+    return get_gatekeeper_agent()
+
+@lru_cache(maxsize=None)
+def _intent_agent():
+    from intent_agent import get_intent_agent
+    return get_intent_agent()
 
 # --- Custom Error Codes and Messages ---
-class APIErrorCodes:
+class APIErrorCodes(IntEnum):
     # Video-related errors (1000-1099)
     VIDEO_NOT_FOUND = 1001
     VIDEO_PRIVATE = 1002
@@ -51,72 +87,358 @@ class APIErrorCodes:
     INVALID_GOAL = 1401
     INVALID_API_KEY = 1402
     MISSING_REQUIRED_FIELDS = 1403
+    PAYLOAD_TOO_LARGE = 1404
     
     # System errors (1500-1599)
     INTERNAL_ERROR = 1501
     SERVICE_UNAVAILABLE = 1502
 
 class APIError(Exception):
+    __slots__ = ('error_code', 'message', 'http_status', 'details')
+
     def __init__(self, error_code, message, http_status=400, details=None):
+        super().__init__(message)
         self.error_code = error_code
         self.message = message
         self.http_status = http_status
         self.details = details or {}
 
+# --- JSON (orjson) helpers ---
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _orjson_default(obj):
+    """Fallback for types orjson does not serialize natively."""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def get_json_body(silent=False):
+    """
+    Parse the request body with orjson, ignoring the Content-Type header
+    (same contract as request.get_json(force=True)).
+    Every endpoint expects a JSON object; anything else is a 400 rather than
+    an AttributeError on data.get() later.
+    With silent=True, returns None instead of raising on an empty/invalid body.
+    """
+    try:
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError as e:
+        if silent:
+            return None
+        raise BadRequest(f"Failed to decode JSON object: {e}")
+    if data is not None and not isinstance(data, dict):
+        if silent:
+            return None
+        raise BadRequest("Request body must be a JSON object")
+    return data
+
+def dumps_json(payload):
+    """Serialize a payload to JSON bytes with the app's orjson options."""
+    return orjson.dumps(payload, default=_orjson_default, option=_ORJSON_OPTIONS)
+
+def json_response(payload):
+    """orjson-backed replacement for flask.jsonify."""
+    return app.response_class(dumps_json(payload), mimetype='application/json')
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, so jsonify(), request.get_json()
+    and extensions (e.g. Flask-Limiter) share the same serializer."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps_json(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Skip the bytes -> str -> bytes round-trip of the default implementation
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_json(obj), mimetype='application/json')
+
+# --- Response caches ---
+class ResponseCache:
+    """TTL + size-bounded cache of serialized JSON response bodies."""
+    def __init__(self, ttl_seconds, maxsize=1024):
+        self._cache = OrderedDict()  # {key: (body_bytes, timestamp)}
+        self._ttl = ttl_seconds
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._cache:
+                body, ts = self._cache[key]
+                if time.time() - ts < self._ttl:
+                    self._cache.move_to_end(key)
+                    return body
+                del self._cache[key]
+        return None
+
+    def set(self, key, body):
+        with self._lock:
+            self._cache[key] = (body, time.time())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+def cached_json_response(body, cache_status):
+    """Wrap pre-serialized JSON bytes in a response tagged with X-Cache."""
+    response = app.response_class(body, mimetype='application/json')
+    if cache_status:
+        response.headers['X-Cache'] = cache_status
+    return response
+
+def conditional_json_response(body, cache_status=None):
+    """
+    cached_json_response plus a content-hash ETag. Returns 304 with no body
+    when the client's If-None-Match already matches, so the response must be
+    returned as-is (not as a (response, 200) tuple).
+    """
+    response = cached_json_response(body, cache_status)
+    response.set_etag(hashlib.blake2b(body, digest_size=16).hexdigest())
+    # Revalidate on every poll: listings change on writes, not on a schedule.
+    # A write shows up on the next poll served by the worker that took it;
+    # other workers catch up within fs.QUERY_CACHE_TTL.
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+# Chapters come from YouTube (comments/transcript), not the library, so library writes can't stale them
+_chapters_cache = ResponseCache(ttl_seconds=3600)
+# Writes invalidate only the worker that handled them; the short TTL bounds staleness elsewhere
+_librarian_video_cache = ResponseCache(ttl_seconds=15)
+# /librarian/search bodies keyed by (query, n_results, goal_filter); cleared on index changes
+_librarian_search_cache = ResponseCache(ttl_seconds=120, maxsize=512)
+# Successful /score bodies keyed by their ETag (which covers the channel blocklist)
+_SCORE_CACHE_TTL = 3600
+_score_cache = ResponseCache(ttl_seconds=_SCORE_CACHE_TTL, maxsize=10000)
+
+# --- Timestamps ---
+_TS_CACHE = [0.0, '']  # [epoch seconds, ISO string]
+
+def now_iso():
+    """ISO timestamp cached for up to 1s (for frequently polled endpoints)."""
+    t = time.time()
+    if t - _TS_CACHE[0] > 1:
+        _TS_CACHE[:] = [t, datetime.now().isoformat()]
+    return _TS_CACHE[1]
+
+@lru_cache(maxsize=256)
+def _error_body_prefix(error_code, message):
+    """Serialized '{"error":true,"error_code":...,"message":...' for one error shape."""
+    return dumps_json({'error': True, 'error_code': error_code, 'message': message})[:-1]
+
 def create_error_response(error_code, message, http_status=400, details=None):
     """Create standardized error response"""
-    return jsonify({
-        'error': True,
-        'error_code': error_code,
-        'message': message,
-        'details': details or {},
-        'timestamp': __import__('datetime').datetime.now().isoformat()
-    }), http_status
+    # Only details and the timestamp vary per call; the rest is serialized once.
+    body = b''.join((
+        _error_body_prefix(error_code, message),
+        b',"details":', dumps_json(details) if details else b'{}',
+        b',"timestamp":', orjson.dumps(now_iso()),
+        b'}'
+    ))
+    return app.response_class(body, mimetype='application/json'), http_status
+
+# Video detail fields handle_missing_data can check, in reporting order
+VIDEO_DETAIL_FIELDS = ('title', 'description', 'tags', 'category')
 
 def handle_missing_data(details, required_parameters):
     """Check for missing data and return appropriate error codes"""
     missing_data = []
     available_parameters = []
-    
-    if 'title' in required_parameters:
-        if not details.get('title'):
-            missing_data.append('title')
-        else:
-            available_parameters.append('title')
-    
-    if 'description' in required_parameters:
-        if not details.get('description'):
-            missing_data.append('description')
-        else:
-            available_parameters.append('description')
-    
-    if 'tags' in required_parameters:
-        if not details.get('tags') or len(details.get('tags', [])) == 0:
-            missing_data.append('tags')
-        else:
-            available_parameters.append('tags')
-    
-    if 'category' in required_parameters:
-        if not details.get('category'):
-            missing_data.append('category')
-        else:
-            available_parameters.append('category')
-    
+    required = frozenset(required_parameters)
+
+    for field in VIDEO_DETAIL_FIELDS:
+        if field in required:
+            # Empty strings and empty tag lists both count as missing
+            (available_parameters if details.get(field) else missing_data).append(field)
+
     return missing_data, available_parameters
 
+# --- Required-field validation ---
+REQUIRED_FIELDS = {
+    '/score': ('video_url', 'goal'),
+    '/coach/analyze': ('session_id', 'goal'),
+    '/librarian/index': ('video_id', 'title', 'transcript', 'goal', 'score'),
+    '/librarian/search': ('query',),
+    '/librarian/chat': ('query',),
+    '/navigator/chapters': ('video_id',),
+    '/gatekeeper/filter': ('goal',),
+    '/gatekeeper/block_channel': ('channel_name',),
+    '/gatekeeper/unblock_channel': ('channel_name',),
+    '/firestore/sessions': ('session_id',),
+    '/librarian/save': ('video_id', 'title', 'goal'),
+    '/librarian/save_summary': ('video_id', 'title', 'goal', 'summary'),
+}
+
+# Valid /score modes; the tuple is echoed back in the 400 details
+SCORE_MODES = ('title_only', 'title_and_description', 'title_and_clean_desc')
+_SCORE_MODE_SET = frozenset(SCORE_MODES)
+
+# Fields where falsy values (e.g. a score of 0) are valid; only None counts as missing.
+_NONE_ONLY_FIELDS = frozenset({'score'})
+
+# Pre-rendered (message, details) for every field that can be reported missing.
+_MISSING_FIELD_ERRORS = {
+    field: (f"{field} is required", {'missing_field': field})
+    for fields in REQUIRED_FIELDS.values()
+    for field in fields
+}
+
+def validate_required(data, fields):
+    """Return the first missing required field, or None if all are present."""
+    for field in fields:
+        value = data.get(field)
+        if value is None or (not value and field not in _NONE_ONLY_FIELDS):
+            return field
+    return None
+
+def missing_field_response(field):
+    """Standard 400 response for a missing required field."""
+    message, details = _MISSING_FIELD_ERRORS[field]
+    return create_error_response(APIErrorCodes.MISSING_REQUIRED_FIELDS, message, 400, details)
+
 # --- Logging setup ---
-logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+# Records are handed to a queue at emit time (so message args and exception
+# text are captured in the request thread) and written by a single listener
+# thread through a 64 KiB buffer, flushed every N records or when idle.
+_LOG_FLUSH_EVERY = 64
+_LOG_FLUSH_INTERVAL = 0.1  # seconds
+
+class _BufferedStreamHandler(logging.StreamHandler):
+    """StreamHandler that batches writes instead of flushing per record."""
+
+    def __init__(self, stream, flush_every=_LOG_FLUSH_EVERY):
+        super().__init__(stream)
+        self.flush_every = flush_every
+        self._pending = 0
+
+    def flush(self):
+        # Called by emit() after every record; only flush once a batch is full.
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.force_flush()
+
+    def force_flush(self):
+        self.acquire()
+        try:
+            if self._pending and self.stream and hasattr(self.stream, 'flush'):
+                self.stream.flush()
+            self._pending = 0
+        finally:
+            self.release()
+
+class _BatchingQueueListener(QueueListener):
+    """QueueListener that flushes its handlers whenever the queue goes idle."""
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, timeout=_LOG_FLUSH_INTERVAL)
+            except queue.Empty:
+                self._flush_handlers()
+
+    def _flush_handlers(self):
+        for handler in self.handlers:
+            if hasattr(handler, 'force_flush'):
+                handler.force_flush()
+
+    def stop(self):
+        super().stop()
+        self._flush_handlers()
+
+def _setup_logging():
+    log_stream = io.TextIOWrapper(
+        open(sys.stderr.fileno(), 'wb', buffering=65536, closefd=False),
+        encoding='utf-8'
+    )
+    stream_handler = _BufferedStreamHandler(log_stream)
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+
+    log_queue = queue.Queue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    # force=True replaces the plain StreamHandlers that agent modules install
+    # via their own basicConfig() calls at import time.
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler], force=True)
+
+    listener = _BatchingQueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+_log_listener = _setup_logging()
+
+# gunicorn forks its workers from this (preloaded) process. The listener thread
+# does not survive fork, and anything left in the inherited buffer would be
+# written again by every child, so the buffer is flushed under the handler lock
+# just before forking and the child starts its own listener without ever
+# stopping (and so flushing) the inherited one.
+def _flush_logs_before_fork():
+    for handler in _log_listener.handlers:
+        handler.acquire()
+        if hasattr(handler, 'force_flush'):
+            handler.force_flush()
+
+def _release_logs_after_fork():
+    for handler in _log_listener.handlers:
+        handler.release()
+
+def _restart_logging_in_child():
+    global _log_listener
+    atexit.unregister(_log_listener.stop)
+    _log_listener = _setup_logging()
+
+os.register_at_fork(
+    before=_flush_logs_before_fork,
+    after_in_parent=_release_logs_after_fork,
+    after_in_child=_restart_logging_in_child,
+)
 logger = logging.getLogger(__name__)
 
+# Tracebacks are expensive to format during error storms: in production only
+# every Nth logged error carries one (all of them in DEBUG).
+_TRACEBACK_SAMPLE_RATE = 1 if Config.DEBUG else 20
+_traceback_counter = itertools.count()
+
+def sample_exc_info():
+    """exc_info value for logger.error(): True for one in every _TRACEBACK_SAMPLE_RATE calls."""
+    return next(_traceback_counter) % _TRACEBACK_SAMPLE_RATE == 0
+
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from google import genai
+import rate_limit_storage  # noqa: F401 - registers the redis+zset:// storage scheme
+from gemini_client import get_gemini_client
 
 # ... (imports)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+# Match '/highlights/' as '/highlights' directly instead of answering with a 308 redirect.
+# Must be set before any route is registered (rules copy it when bound).
+app.url_map.strict_slashes = False
 CORS(app, resources={r"/*": {"origins": "*"}}, methods=["GET", "POST", "OPTIONS"], allow_headers=["Content-Type", "X-API-KEY"])
 
+# --- Response compression (search results, transcripts, session analyses) ---
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_LEVEL'] = 5
+app.config['COMPRESS_BR_LEVEL'] = 4
+app.config['COMPRESS_MIN_SIZE'] = 512
+
+# --- Request size ceiling (rejects oversized transcript uploads before buffering) ---
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
+Compress(app)
+
 @app.after_request
 def after_request(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
@@ -136,13 +458,20 @@ limiter = Limiter(
     get_remote_address,
     app=app,
     default_limits=[Config.RATELIMIT_DEFAULT],
-    storage_uri=Config.RATELIMIT_STORAGE_URL
+    storage_uri=Config.RATELIMIT_STORAGE_URL,
+    strategy=Config.RATELIMIT_STRATEGY
 )
 
 # --- Security: API Key check ---
+def _hash_api_key(key):
+    """Fixed-size digest so the comparison below runs in constant time."""
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=32).digest()
+
+_API_KEY_HASH = _hash_api_key(Config.API_KEY)
+
 def require_api_key():
     key = request.headers.get('X-API-KEY')
-    if not key or key != Config.API_KEY:
+    if not key or not hmac.compare_digest(_hash_api_key(key), _API_KEY_HASH):
         logger.warning('Unauthorized access attempt.')
         # Raise a structured API error so clients always receive JSON
         raise APIError(APIErrorCodes.INVALID_API_KEY,
@@ -151,80 +480,144 @@ def require_api_key():
 
 @app.before_request
 def log_request_info():
-    logger.info(f"{request.method} {request.path} - {request.remote_addr}")
+    logger.info("%s %s - %s", request.method, request.path, request.remote_addr)
+
+# Endpoints reachable without X-API-KEY; unmatched routes (404/405) and CORS
+# preflights also skip the check so their own handlers respond.
+_PUBLIC_ENDPOINTS = frozenset({'health', 'static'})
+
+@app.before_request
+def check_api_key():
+    if request.method == 'OPTIONS' or request.endpoint is None or request.endpoint in _PUBLIC_ENDPOINTS:
+        return
+    require_api_key()
+
+@app.before_request
+def check_content_length():
+    # Runs after the API key check, so unauthenticated bodies are never read.
+    # Werkzeug only enforces MAX_CONTENT_LENGTH once the body is read; reject
+    # on the declared length before any handler buffers or parses it.
+    content_length = request.content_length
+    if content_length and content_length > app.config['MAX_CONTENT_LENGTH']:
+        abort(413)
+
+# --- Shared worker pool for overlapping independent I/O within a request ---
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='api')
+
+# --- Health check probes ---
+# Each probe returns (dependency_status, overall_status_if_not_ok).
+_HEALTH_CHECK_TIMEOUT = 2.0
+_HEALTH_CACHE_TTL = 30  # seconds; load balancers poll far more often than this
+# Failures (errors, timeouts, degraded configs) are re-probed soon, so a slow
+# first probe at boot doesn't pin the endpoint to 'degraded'
+_HEALTH_FAILURE_CACHE_TTL = 3
+_health_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='health')
+_health_cache = {}  # {check_name: (expires_at, (result, latency_ms))}
+
+def check_youtube():
+    """Check 1: YouTube API (configuration only, no network call)."""
+    # We rely on Config validation usually; checking configuration as "healthy"
+    # implies configuration is present.
+    if Config.YOUTUBE_API_KEY:
+        return 'configured', None
+    return 'missing', 'degraded'
+
+def check_gemini():
+    """Check 2: Gemini API (lists models as a lightweight connectivity check)."""
+    client = get_gemini_client()
+    if not client:
+        return 'missing', 'degraded'
+    list(client.models.list_models(page_size=1))
+    return 'connected', None
+
+def check_firestore():
+    """Check 3: Firestore (via Librarian Agent connection check)."""
+    agent = _librarian_agent()
+    if agent and agent.db:
+        # Trust initialization rather than issuing a read.
+        return 'connected', None
+    return 'disconnected', 'degraded'  # Librarian features unavailable
+
+# name -> (probe, overall status when the probe raises or times out)
+_HEALTH_CHECKS = {
+    'youtube_api': (check_youtube, 'degraded'),
+    'gemini_api': (check_gemini, 'unhealthy'),  # Critical dependency
+    'firestore': (check_firestore, 'degraded'),
+}
+
+_STATUS_SEVERITY = {'healthy': 0, 'degraded': 1, 'unhealthy': 2}
+
+def _timed_probe(probe):
+    start_time = time.time()
+    try:
+        result = probe()
+    except Exception as e:
+        result = e
+    return result, int((time.time() - start_time) * 1000)
+
+def _get_cached_probe(name):
+    """Return a cached (result, latency_ms) for a probe if still fresh."""
+    if name in _health_cache:
+        expires_at, outcome = _health_cache[name]
+        if time.time() < expires_at:
+            return outcome
+    return None
+
+def _cache_probe(name, outcome):
+    result = outcome[0]
+    healthy = not isinstance(result, Exception) and result[1] is None
+    ttl = _HEALTH_CACHE_TTL if healthy else _HEALTH_FAILURE_CACHE_TTL
+    _health_cache[name] = (time.time() + ttl, outcome)
 
 @app.route('/health', methods=['GET'])
 @limiter.exempt  # Exempt health check from rate limits
 def health():
     """Health check endpoint with system status and dependency verification"""
     
-    # Verify Dependencies
-    dependencies = {
-        'youtube_api': {'status': 'unknown', 'latency_ms': 0},
-        'gemini_api': {'status': 'unknown', 'latency_ms': 0}
-    }
-    
-    status = 'healthy'
-    
-    # Check 1: YouTube API (via Client)
-    start_time = __import__('time').time()
-    try:
-        # Simple lightweight call to verify connectivity
-        if Config.YOUTUBE_API_KEY:
-             # Minimal call to check key validity (using requests directly or client)
-             # We rely on Config validation usually, but here we can check connectivity if desired.
-             # For now, just checking configuration as "healthy" implies configuration is present.
-             dependencies['youtube_api']['status'] = 'configured'
+    # Run the dependency probes concurrently so latency is max(checks), not sum.
+    # Fresh results are served from the cache without touching the dependency.
+    outcomes = {}
+    futures = {}
+    for name, (probe, _) in _HEALTH_CHECKS.items():
+        cached = _get_cached_probe(name)
+        if cached is not None:
+            outcomes[name] = cached
         else:
-             dependencies['youtube_api']['status'] = 'missing'
-             status = 'degraded'
-    except Exception as e:
-        dependencies['youtube_api']['status'] = f'error: {str(e)}'
-        status = 'degraded'
-    dependencies['youtube_api']['latency_ms'] = int((__import__('time').time() - start_time) * 1000)
+            futures[name] = _health_executor.submit(_timed_probe, probe)
 
-    # Check 2: Gemini API
-    start_time = __import__('time').time()
-    try:
-        if Config.GOOGLE_API_KEY:
-            client = genai.Client(api_key=Config.GOOGLE_API_KEY)
-            # List models as a lightweight check
-            list(client.models.list_models(page_size=1)) 
-            dependencies['gemini_api']['status'] = 'connected'
-        else:
-            dependencies['gemini_api']['status'] = 'missing'
-            status = 'degraded'
-    except Exception as e:
-        dependencies['gemini_api']['status'] = f'error: {str(e)}'
-        status = 'unhealthy' # Critical dependency
-    dependencies['gemini_api']['latency_ms'] = int((__import__('time').time() - start_time) * 1000)
+    for name, future in futures.items():
+        try:
+            outcomes[name] = future.result(timeout=_HEALTH_CHECK_TIMEOUT)
+        except FutureTimeoutError:
+            outcomes[name] = (
+                TimeoutError(f'no response within {_HEALTH_CHECK_TIMEOUT}s'),
+                int(_HEALTH_CHECK_TIMEOUT * 1000)
+            )
+        _cache_probe(name, outcomes[name])
 
-    # Check 3: Firestore (via Librarian Agent connection check)
-    start_time = __import__('time').time()
-    try:
-        from librarian_agent import get_librarian_agent
-        agent = get_librarian_agent()
-        if agent and agent.db:
-            # Lightweight check: Access collection reference (doesn't make network call yet usually)
-            # or try a minimal read. Let's trust initialization.
-            dependencies['firestore'] = {'status': 'connected', 'latency_ms': 0}
+    dependencies = {}
+    status = 'healthy'
+    for name, (_, failure_status) in _HEALTH_CHECKS.items():
+        result, latency_ms = outcomes[name]
+
+        if isinstance(result, Exception):
+            dep_status, impact = f'error: {str(result)}', failure_status
         else:
-            dependencies['firestore'] = {'status': 'disconnected', 'latency_ms': 0}
-            status = 'degraded' # Librarian features unavailable
-    except Exception as e:
-        dependencies['firestore'] = {'status': f'error: {str(e)}', 'latency_ms': 0}
-        status = 'degraded'
-    dependencies['firestore']['latency_ms'] = int((__import__('time').time() - start_time) * 1000)
+            dep_status, impact = result
+
+        dependencies[name] = {'status': dep_status, 'latency_ms': latency_ms}
+        if impact and _STATUS_SEVERITY[impact] > _STATUS_SEVERITY[status]:
+            status = impact
 
     try:
-        return jsonify({
+        return json_response({
             'status': status,
             'service': 'TubeFocus API',
-            'timestamp': __import__('datetime').datetime.now().isoformat(),
+            'timestamp': now_iso(),
             'dependencies': dependencies,
             'system_info': {
                 'environment': Config.ENVIRONMENT,
-                'python_version': __import__('sys').version
+                'python_version': sys.version
             }
         }), 200 # Always return 200 to allow clients to see the status details
     except Exception as e:
@@ -236,138 +629,154 @@ def health():
         )
 
 
-
 @app.route('/score', methods=['POST'])
 def score_endpoint():
-    require_api_key()
-    try:
-        data = request.get_json(force=True)
-        video_url = data.get('video_url')
-        goal = data.get('goal')
-        mode = data.get('mode', 'title_and_description')  # Default to "title_and_description"
-        transcript = data.get('transcript', '')
+    data = get_json_body()
+    video_url = data.get('video_url')
+    goal = data.get('goal')
+    mode = data.get('mode', 'title_and_description')  # Default to "title_and_description"
+    transcript = data.get('transcript', '')
+
+    # Validate required fields
+    missing = validate_required(data, REQUIRED_FIELDS['/score'])
+    if missing:
+        return missing_field_response(missing)
+
+    # Sanitize inputs
+    if not isinstance(video_url, str) or not video_url:
+        return create_error_response(
+            APIErrorCodes.INVALID_VIDEO_URL,
+            "Invalid video_url format",
+            400,
+            {'video_url': video_url, 'expected_format': 'Valid YouTube URL'}
+        )
+    
+    if not isinstance(goal, str) or not 2 < len(goal) < 200:
+        return create_error_response(
+            APIErrorCodes.INVALID_GOAL,
+            "Invalid goal format",
+            400,
+            {'goal': goal, 'expected_format': '2-200 characters'}
+        )
+    
+    if not isinstance(mode, str) or mode not in _SCORE_MODE_SET:
+        return create_error_response(
+            APIErrorCodes.INVALID_PARAMETERS,
+            "Invalid mode value",
+            400,
+            {'mode': mode, 'valid_modes': SCORE_MODES}
+        )
 
-        # Infer Intent (Cached/Lightweight)
-        intent = get_intent_agent().infer_intent(goal)
-        logger.info(f"Inferred Intent for '{goal}': {intent['intent']}")
+    # Check YouTube API key availability
+    if not Config.YOUTUBE_API_KEY:
+        return create_error_response(
+            APIErrorCodes.YOUTUBE_API_KEY_MISSING,
+            "YouTube API key not configured",
+            503,
+            {'solution': 'Set YOUTUBE_API_KEY environment variable'}
+        )
 
-        # Validate required fields
-        if not video_url:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "video_url is required",
-                400,
-                {'missing_field': 'video_url'}
-            )
-        
-        if not goal:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "goal is required",
-                400,
-                {'missing_field': 'goal'}
-            )
+    blocked_channels = _gatekeeper_agent().get_blocked_channels()
+    etag = _score_etag(video_url, goal, mode, transcript, blocked_channels)
+    cached = _score_cache.get(etag)
+    if cached is not None:
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        return _score_response(cached, etag, 'HIT'), 200
 
-        # Sanitize inputs
-        if not isinstance(video_url, str) or not video_url:
-            return create_error_response(
-                APIErrorCodes.INVALID_VIDEO_URL,
-                "Invalid video_url format",
-                400,
-                {'video_url': video_url, 'expected_format': 'Valid YouTube URL'}
-            )
+    return _score_video(video_url, goal, mode, transcript, blocked_channels, etag)
+
+
+def _score_etag(video_url, goal, mode, transcript, blocked_channels):
+    """
+    Content-addressed key for a /score request (the body echoes video_url, so
+    it is keyed as sent). The channel blocklist is part of the key, so a block
+    or unblock changes the key instead of relying on clearing every worker's cache.
+    """
+    blocklist = '\x1f'.join(sorted(blocked_channels))
+    raw = f"{video_url}|{goal}|{mode}|{transcript}|{blocklist}".encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+def _score_response(body, etag, cache_status):
+    response = cached_json_response(body, cache_status)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'private, max-age={_SCORE_CACHE_TTL}'
+    return response
+
+
+def _score_video(video_url, goal, mode, transcript, blocked_channels, etag):
+    """
+    Score one video; returns (response, http_status) like a view function.
+    Successful results are stored in _score_cache under etag.
+    """
+    from simple_scoring import compute_simple_score, compute_simple_score_from_title, compute_simple_score_title_and_clean_desc
+
+    # Infer Intent in the background while the YouTube fetch/scoring runs
+    intent_future = _executor.submit(_intent_agent().infer_intent, goal)
+
+    # Compute score using simplified approach
+    try:
+        if mode == "title_only":
+            # These alias functions need update too if used, but for now specific on main function
+            score = compute_simple_score_from_title(video_url, goal)
+            debug_info = {}
+            intent = intent_future.result()
+        elif mode == "title_and_clean_desc":
+            score = compute_simple_score_title_and_clean_desc(video_url, goal)
+            debug_info = {}
+            intent = intent_future.result()
+        else:
+            video_details = get_video_details(video_url)
+            if not video_details:
+                raise ValueError(f"Could not retrieve details for video {video_url}")
+            intent = intent_future.result()
+            score, reasoning, debug_info = compute_simple_score(video_url, goal, transcript=transcript, intent=intent, blocked_channels=blocked_channels, video_details=video_details)
         
-        if not isinstance(goal, str) or not 2 < len(goal) < 200:
+        logger.info("Inferred Intent for '%s': %s", goal, intent['intent'])
+        logger.info("/score/simple %s %s -> %s", video_url, mode, score)
+        body = dumps_json({
+            "score": score, 
+            "mode": mode,
+            "video_url": video_url,
+            "goal": goal,
+            "debug_details": debug_info,
+            "intent": intent.get('intent', 'General')
+        })
+        _score_cache.set(etag, body)
+        return _score_response(body, etag, 'MISS'), 200
+        
+    except ValueError as ve:
+        # Check if we have attached debug info
+        debug_details = getattr(ve, 'debug_info', {})
+        
+        # Handle video not found, private, deleted, etc.
+        if "Video not found" in str(ve):
             return create_error_response(
-                APIErrorCodes.INVALID_GOAL,
-                "Invalid goal format",
-                400,
-                {'goal': goal, 'expected_format': '2-200 characters'}
+                APIErrorCodes.VIDEO_NOT_FOUND,
+                "Video not found or inaccessible",
+                404,
+                {'video_url': video_url, 'possible_reasons': ['Video is private', 'Video is deleted', 'Invalid URL'], 'debug_details': debug_details}
             )
-        
-        if mode not in ['title_only', 'title_and_description', 'title_and_clean_desc']:
+        else:
             return create_error_response(
-                APIErrorCodes.INVALID_PARAMETERS,
-                "Invalid mode value",
+                APIErrorCodes.INVALID_VIDEO_URL,
+                "Invalid video URL format",
                 400,
-                {'mode': mode, 'valid_modes': ['title_only', 'title_and_description', 'title_and_clean_desc']}
+                {'video_url': video_url, 'error': str(ve), 'debug_details': debug_details}
             )
-
-        # Check YouTube API key availability
-        if not Config.YOUTUBE_API_KEY:
+            
+    except RuntimeError as re:
+        if "Simple scoring models are not loaded" in str(re):
             return create_error_response(
-                APIErrorCodes.YOUTUBE_API_KEY_MISSING,
-                "YouTube API key not configured",
+                APIErrorCodes.SCORING_MODELS_NOT_LOADED,
+                "Scoring models not available",
                 503,
-                {'solution': 'Set YOUTUBE_API_KEY environment variable'}
+                {'solution': 'Check if models are properly loaded'}
             )
-
-        # Compute score using simplified approach
-        try:
-            if mode == "title_only":
-                # These alias functions need update too if used, but for now specific on main function
-                score = compute_simple_score_from_title(video_url, goal)
-                debug_info = {}
-            elif mode == "title_and_clean_desc":
-                score = compute_simple_score_title_and_clean_desc(video_url, goal)
-                debug_info = {}
-            else:
-                gatekeeper = get_gatekeeper_agent()
-                blocked_channels = gatekeeper.get_blocked_channels()
-                score, reasoning, debug_info = compute_simple_score(video_url, goal, transcript=transcript, intent=intent, blocked_channels=blocked_channels)
-            
-            logger.info(f"/score/simple {video_url} {mode} -> {score}")
-            return jsonify({
-                "score": score, 
-                "mode": mode,
-                "video_url": video_url,
-                "goal": goal,
-                "debug_details": debug_info,
-                "intent": intent.get('intent', 'General')
-            }), 200
-            
-        except ValueError as ve:
-            # Check if we have attached debug info
-            debug_details = getattr(ve, 'debug_info', {})
-            
-            # Handle video not found, private, deleted, etc.
-            if "Video not found" in str(ve):
-                return create_error_response(
-                    APIErrorCodes.VIDEO_NOT_FOUND,
-                    "Video not found or inaccessible",
-                    404,
-                    {'video_url': video_url, 'possible_reasons': ['Video is private', 'Video is deleted', 'Invalid URL'], 'debug_details': debug_details}
-                )
-            else:
-                return create_error_response(
-                    APIErrorCodes.INVALID_VIDEO_URL,
-                    "Invalid video URL format",
-                    400,
-                    {'video_url': video_url, 'error': str(ve), 'debug_details': debug_details}
-                )
-                
-        except RuntimeError as re:
-            if "Simple scoring models are not loaded" in str(re):
-                return create_error_response(
-                    APIErrorCodes.SCORING_MODELS_NOT_LOADED,
-                    "Scoring models not available",
-                    503,
-                    {'solution': 'Check if models are properly loaded'}
-                )
-            else:
-                raise re
-        
-    except Exception as e:
-        logger.error(f"/score/simple error: {e}", exc_info=True)
-        return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Internal server error during simple scoring",
-            500,
-            {'error_details': str(e)}
-        )
-
-
-
+        else:
+            raise re
 
 
 @app.route('/coach/analyze', methods=['POST'])
@@ -384,30 +793,17 @@ def coach_analyze():
         ]
     }
     """
-    require_api_key()
     try:
-        data = request.get_json(force=True)
+        data = get_json_body()
         session_id = data.get('session_id')
         goal = data.get('goal')
         session_data = data.get('session_data', [])
         
         # Validate required fields
-        if not session_id:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "session_id is required",
-                400,
-                {'missing_field': 'session_id'}
-            )
-        
-        if not goal:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "goal is required",
-                400,
-                {'missing_field': 'goal'}
-            )
-        
+        missing = validate_required(data, REQUIRED_FIELDS['/coach/analyze'])
+        if missing:
+            return missing_field_response(missing)
+
         if not isinstance(session_data, list):
             return create_error_response(
                 APIErrorCodes.INVALID_PARAMETERS,
@@ -417,10 +813,10 @@ def coach_analyze():
             )
         
         # Get Coach Agent instance
-        coach = get_coach_agent()
+        coach = _coach_agent()
         
         # Perform autonomous analysis
-        logger.info(f"Coach analyzing session: {session_id} with {len(session_data)} videos")
+        logger.info("Coach analyzing session: %s with %s videos", session_id, len(session_data))
         analysis = coach.analyze_session(
             session_id=session_id,
             session_data=session_data,
@@ -428,17 +824,17 @@ def coach_analyze():
         )
         
         # Return analysis results
-        return jsonify({
+        return json_response({
             'success': True,
             'session_id': session_id,
             'analysis': analysis,
-            'timestamp': __import__('datetime').datetime.now().isoformat()
+            'timestamp': now_iso()
         }), 200
         
     except Exception as e:
-        logger.error(f"/coach/analyze error: {e}", exc_info=True)
+        logger.error("/coach/analyze error: %s", e, exc_info=sample_exc_info())
         # Fail-open so frontend coaching does not spam hard errors in the extension console.
-        return jsonify({
+        return json_response({
             'success': False,
             'session_id': data.get('session_id') if 'data' in locals() and isinstance(data, dict) else None,
             'analysis': {
@@ -448,11 +844,10 @@ def coach_analyze():
                 'suggested_action': 'continue'
             },
             'error': str(e),
-            'timestamp': __import__('datetime').datetime.now().isoformat()
+            'timestamp': now_iso()
         }), 200
 
 
-
 @app.route('/librarian/index', methods=['POST'])
 def librarian_index():
     """
@@ -467,95 +862,53 @@ def librarian_index():
         "metadata": {} (optional)
     }
     """
-    require_api_key()
-    try:
-        data = request.get_json(force=True)
-        video_id = data.get('video_id')
-        title = data.get('title')
-        transcript = data.get('transcript')
-        goal = data.get('goal')
-        score = data.get('score')
-        metadata = data.get('metadata', {})
-        
-        # Validate required fields
-        if not video_id:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "video_id is required",
-                400,
-                {'missing_field': 'video_id'}
-            )
-        
-        if not title:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "title is required",
-                400,
-                {'missing_field': 'title'}
-            )
-        
-        if not transcript:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "transcript is required",
-                400,
-                {'missing_field': 'transcript'}
-            )
-        
-        if not goal:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "goal is required",
-                400,
-                {'missing_field': 'goal'}
-            )
-        
-        if score is None:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "score is required",
-                400,
-                {'missing_field': 'score'}
-            )
-        
-        # Get Librarian Agent instance
-        librarian = get_librarian_agent()
-        
-        # Index the video (pass segments for hierarchical chunking)
-        logger.info(f"Librarian indexing video: {video_id}")
-        segments = data.get('segments')  # timestamped transcript segments
-        success = librarian.index_video(
-            video_id=video_id,
-            title=title,
-            transcript=transcript,
-            goal=goal,
-            score=score,
-            metadata=metadata,
-            segments=segments
-        )
-        
-        if success:
-            stats = librarian.get_stats()
-            return jsonify({
-                'success': True,
-                'video_id': video_id,
-                'message': 'Video indexed successfully',
-                'stats': stats
-            }), 200
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'Failed to index video'
-            }), 500
-        
-    except Exception as e:
-        logger.error(f"/librarian/index error: {e}", exc_info=True)
-        return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Librarian indexing failed",
-            500,
-            {'error_details': str(e)}
-        )
+    data = get_json_body()
+    video_id = data.get('video_id')
+    title = data.get('title')
+    transcript = data.get('transcript')
+    goal = data.get('goal')
+    score = data.get('score')
+    metadata = data.get('metadata', {})
+    
+    # Validate required fields
+    missing = validate_required(data, REQUIRED_FIELDS['/librarian/index'])
+    if missing:
+        return missing_field_response(missing)
+
+    # Get Librarian Agent instance
+    librarian = _librarian_agent()
+    
+    # Index the video (pass segments for hierarchical chunking)
+    logger.info("Librarian indexing video: %s", video_id)
+    segments = data.get('segments')  # timestamped transcript segments
+    success = librarian.index_video(
+        video_id=video_id,
+        title=title,
+        transcript=transcript,
+        goal=goal,
+        score=score,
+        metadata=metadata,
+        segments=segments
+    )
+    
+    if success:
+        _librarian_video_cache.invalidate(video_id)
+        _librarian_search_cache.clear()
+        stats = librarian.get_stats()
+        return json_response({
+            'success': True,
+            'video_id': video_id,
+            'message': 'Video indexed successfully',
+            'stats': stats
+        }), 200
+    else:
+        return json_response({
+            'success': False,
+            'error': 'Failed to index video'
+        }), 500
+
+
+_MAX_SEARCH_QUERIES = 10  # per /librarian/search request
 
 @app.route('/librarian/search', methods=['POST'])
 def librarian_search():
@@ -564,51 +917,94 @@ def librarian_search():
     POST /librarian/search
     Body: {
         "query": "...",
+        "queries": ["...", ...] (optional, replaces "query"; up to 10),
         "n_results": 5 (optional),
         "goal_filter": "..." (optional)
     }
+    With "queries", search_results is a list of result sets in input order.
     """
-    require_api_key()
-    try:
-        data = request.get_json(force=True)
-        query = data.get('query')
-        n_results = data.get('n_results', 5)
-        goal_filter = data.get('goal_filter')
-        
-        # Validate required fields
-        if not query:
+    data = get_json_body()
+    query = data.get('query')
+    queries = data.get('queries')
+    n_results = data.get('n_results', 5)
+    goal_filter = data.get('goal_filter')
+
+    # Both feed the search cache key, so they must be hashable scalars
+    if not isinstance(n_results, int) or n_results < 1:
+        return create_error_response(
+            APIErrorCodes.INVALID_PARAMETERS,
+            "n_results must be a positive integer",
+            400
+        )
+    if goal_filter is not None and not isinstance(goal_filter, str):
+        return create_error_response(
+            APIErrorCodes.INVALID_PARAMETERS,
+            "goal_filter must be a string",
+            400
+        )
+
+    if queries is not None:
+        if (not isinstance(queries, list) or not 0 < len(queries) <= _MAX_SEARCH_QUERIES
+                or not all(isinstance(q, str) and q for q in queries)):
             return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "query is required",
+                APIErrorCodes.INVALID_PARAMETERS,
+                "queries must be a list of non-empty strings",
                 400,
-                {'missing_field': 'query'}
+                {'max_queries': _MAX_SEARCH_QUERIES}
             )
-        
-        # Get Librarian Agent instance
-        librarian = get_librarian_agent()
-        
-        # Perform search
-        logger.info(f"Librarian searching for: '{query}'")
-        results = librarian.search_history(
-            query=query,
+        cache_key = (tuple(queries), n_results, goal_filter)
+        cached = _librarian_search_cache.get(cache_key)
+        if cached is not None:
+            return cached_json_response(cached, 'HIT'), 200
+        logger.info("Librarian searching for %s queries", len(queries))
+        results = _librarian_agent().search_history_many(
+            queries,
             n_results=n_results,
             goal_filter=goal_filter
         )
-        
-        return jsonify({
+        body = dumps_json({
             'success': True,
             'search_results': results
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"/librarian/search error: {e}", exc_info=True)
+        })
+        _librarian_search_cache.set(cache_key, body)
+        return cached_json_response(body, 'MISS'), 200
+    
+    # Validate required fields
+    missing = validate_required(data, REQUIRED_FIELDS['/librarian/search'])
+    if missing:
+        return missing_field_response(missing)
+
+    if not isinstance(query, str):
         return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Librarian search failed",
-            500,
-            {'error_details': str(e)}
+            APIErrorCodes.INVALID_PARAMETERS,
+            "query must be a string",
+            400
         )
 
+    cache_key = (query, n_results, goal_filter)
+    cached = _librarian_search_cache.get(cache_key)
+    if cached is not None:
+        return cached_json_response(cached, 'HIT'), 200
+
+    # Get Librarian Agent instance
+    librarian = _librarian_agent()
+    
+    # Perform search
+    logger.info("Librarian searching for: '%s'", query)
+    results = librarian.search_history(
+        query=query,
+        n_results=n_results,
+        goal_filter=goal_filter
+    )
+    
+    body = dumps_json({
+        'success': True,
+        'search_results': results
+    })
+    _librarian_search_cache.set(cache_key, body)
+    return cached_json_response(body, 'MISS'), 200
+
+
 @app.route('/librarian/video/<video_id>', methods=['GET', 'DELETE'])
 def librarian_get_or_delete_video(video_id):
     """
@@ -616,44 +1012,42 @@ def librarian_get_or_delete_video(video_id):
     GET /librarian/video/<video_id>
     DELETE /librarian/video/<video_id>
     """
-    require_api_key()
-    try:
-        librarian = get_librarian_agent()
-        
-        if request.method == 'DELETE':
-            success = librarian.delete_video(video_id)
-            if success:
-                return jsonify({
-                    'success': True,
-                    'message': 'Video deleted successfully'
-                }), 200
-            else:
-                return jsonify({
-                    'success': False,
-                    'error': 'Video not found or deletion failed'
-                }), 404
-        
-        # GET request
-        video = librarian.get_video_by_id(video_id)
-        if video:
-            return jsonify({
+    librarian = _librarian_agent()
+    
+    if request.method == 'DELETE':
+        _librarian_video_cache.invalidate(video_id)
+        _librarian_search_cache.clear()
+        success = librarian.delete_video(video_id)
+        if success:
+            return json_response({
                 'success': True,
-                'video': video
+                'message': 'Video deleted successfully'
             }), 200
         else:
-            return jsonify({
+            return json_response({
                 'success': False,
-                'error': 'Video not found'
+                'error': 'Video not found or deletion failed'
             }), 404
-        
-    except Exception as e:
-        logger.error(f"/librarian/video error: {e}", exc_info=True)
-        return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Failed to process video request",
-            500,
-            {'error_details': str(e)}
-        )
+    
+    # GET request
+    cached = _librarian_video_cache.get(video_id)
+    if cached is not None:
+        return cached_json_response(cached, 'HIT'), 200
+
+    video = librarian.get_video_by_id(video_id)
+    if video:
+        body = dumps_json({
+            'success': True,
+            'video': video
+        })
+        _librarian_video_cache.set(video_id, body)
+        return cached_json_response(body, 'MISS'), 200
+    else:
+        return json_response({
+            'success': False,
+            'error': 'Video not found'
+        }), 404
+
 
 @app.route('/librarian/stats', methods=['GET'])
 def librarian_stats():
@@ -661,24 +1055,14 @@ def librarian_stats():
     Get Librarian statistics.
     GET /librarian/stats
     """
-    require_api_key()
-    try:
-        librarian = get_librarian_agent()
-        stats = librarian.get_stats()
-        
-        return jsonify({
-            'success': True,
-            'stats': stats
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"/librarian/stats error: {e}", exc_info=True)
-        return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Failed to retrieve stats",
-            500,
-            {'error_details': str(e)}
-        )
+    librarian = _librarian_agent()
+    stats = librarian.get_stats()
+    
+    return json_response({
+        'success': True,
+        'stats': stats
+    }), 200
+
 
 @app.route('/librarian/chat', methods=['POST'])
 def librarian_chat():
@@ -692,43 +1076,29 @@ def librarian_chat():
         "attached_highlight": {"video_id": "...", "video_title": "...", "range_label": "...", "note": "...", "transcript": "..."} (optional)
     }
     """
-    require_api_key()
-    try:
-        data = request.get_json(force=True)
-        query = data.get('query')
-        focus_video_id = data.get('focus_video_id')
-        chat_history = data.get('chat_history') or []
-        attached_highlight = data.get('attached_highlight')
-
-        if not query:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "query is required",
-                400,
-                {'missing_field': 'query'}
-            )
+    data = get_json_body()
+    query = data.get('query')
+    focus_video_id = data.get('focus_video_id')
+    chat_history = data.get('chat_history') or []
+    attached_highlight = data.get('attached_highlight')
+
+    missing = validate_required(data, REQUIRED_FIELDS['/librarian/chat'])
+    if missing:
+        return missing_field_response(missing)
+
+    librarian = _librarian_agent()
+    response = librarian.chat(
+        query,
+        focus_video_id=focus_video_id,
+        chat_history=chat_history,
+        attached_highlight=attached_highlight
+    )
 
-        librarian = get_librarian_agent()
-        response = librarian.chat(
-            query,
-            focus_video_id=focus_video_id,
-            chat_history=chat_history,
-            attached_highlight=attached_highlight
-        )
+    return json_response({
+        'success': True,
+        'response': response
+    }), 200
 
-        return jsonify({
-            'success': True,
-            'response': response
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"/librarian/chat error: {e}", exc_info=True)
-        return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Librarian chat failed",
-            500,
-            {'error_details': str(e)}
-        )
 
 @app.route('/navigator/chapters', methods=['POST'])
 def navigator_get_chapters():
@@ -737,35 +1107,29 @@ def navigator_get_chapters():
     POST /navigator/chapters
     Body: { "video_id": "..." }
     """
-    require_api_key()
-    try:
-        data = request.get_json(force=True)
-        video_id = data.get('video_id')
-        
-        if not video_id:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "video_id is required",
-                400,
-                {'missing_field': 'video_id'}
-            )
-            
-        navigator = get_navigator_agent()
-        result = navigator.get_chapters(video_id)
-        
-        return jsonify({
-            'success': True,
-            'result': result
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"/navigator/chapters error: {e}", exc_info=True)
-        return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Navigator chapters failed",
-            500,
-            {'error_details': str(e)}
-        )
+    data = get_json_body()
+    video_id = data.get('video_id')
+    
+    missing = validate_required(data, REQUIRED_FIELDS['/navigator/chapters'])
+    if missing:
+        return missing_field_response(missing)
+
+    cached = _chapters_cache.get(video_id)
+    if cached is not None:
+        return cached_json_response(cached, 'HIT'), 200
+
+    navigator = _navigator_agent()
+    result = navigator.get_chapters(video_id)
+    
+    body = dumps_json({
+        'success': True,
+        'result': result
+    })
+    # Only keep real chapter lists; errors/empty results should be retried.
+    if result.get('chapters'):
+        _chapters_cache.set(video_id, body)
+    return cached_json_response(body, 'MISS'), 200
+
 
 @app.route('/gatekeeper/filter', methods=['POST'])
 def gatekeeper_filter():
@@ -777,43 +1141,30 @@ def gatekeeper_filter():
         "videos": [ {"id": "...", "title": "..."}, ... ] 
     }
     """
-    require_api_key()
-    try:
-        data = request.get_json(force=True)
-        goal = data.get('goal')
-        videos = data.get('videos', [])
-        
-        if not goal:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "goal is required",
-                400,
-                {'missing_field': 'goal'}
-            )
-            
-        if not videos:
-            return jsonify({'success': True, 'results': []}), 200
-            
-        # Infer Intent
-        intent = get_intent_agent().infer_intent(goal)
-        
-        gatekeeper = get_gatekeeper_agent()
-        results = gatekeeper.filter_recommendations(videos, goal, intent=intent)
-        
-        return jsonify({
-            'success': True,
-            'results': results
-        }), 200
+    data = get_json_body()
+    goal = data.get('goal')
+    videos = data.get('videos', [])
+    
+    missing = validate_required(data, REQUIRED_FIELDS['/gatekeeper/filter'])
+    if missing:
+        return missing_field_response(missing)
+
+    if not videos:
+        return json_response({'success': True, 'results': []}), 200
         
-    except Exception as e:
-        logger.error(f"/gatekeeper/filter error: {e}", exc_info=True)
-        # Fail open (return empty results, frontend should probably keep videos)
-        return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Gatekeeper filtering failed",
-            500,
-            {'error_details': str(e)}
-        )
+    gatekeeper = _gatekeeper_agent()
+
+    # Infer Intent (only consumed by the LLM filter; skip when the
+    # gatekeeper has no client and will keep everything anyway)
+    intent = _intent_agent().infer_intent(goal) if gatekeeper.client else None
+
+    results = gatekeeper.filter_recommendations(videos, goal, intent=intent)
+    
+    return json_response({
+        'success': True,
+        'results': results
+    }), 200
+
 
 @app.route('/gatekeeper/block_channel', methods=['POST'])
 def gatekeeper_block_channel():
@@ -822,17 +1173,15 @@ def gatekeeper_block_channel():
     POST /gatekeeper/block_channel
     Body: { "channel_name": "..." }
     """
-    require_api_key()
-    try:
-        data = request.get_json(force=True)
-        channel = data.get('channel_name')
-        if not channel:
-            return create_error_response(APIErrorCodes.MISSING_REQUIRED_FIELDS, "channel_name required", 400)
-            
-        get_gatekeeper_agent().block_channel(channel)
-        return jsonify({'success': True, 'message': f'Blocked {channel}'}), 200
-    except Exception as e:
-         return create_error_response(APIErrorCodes.INTERNAL_ERROR, str(e), 500)
+    data = get_json_body()
+    missing = validate_required(data, REQUIRED_FIELDS['/gatekeeper/block_channel'])
+    if missing:
+        return missing_field_response(missing)
+    channel = data['channel_name']
+        
+    _gatekeeper_agent().block_channel(channel)
+    return json_response({'success': True, 'message': f'Blocked {channel}'}), 200
+
 
 @app.route('/gatekeeper/unblock_channel', methods=['POST'])
 def gatekeeper_unblock_channel():
@@ -841,17 +1190,14 @@ def gatekeeper_unblock_channel():
     POST /gatekeeper/unblock_channel
     Body: { "channel_name": "..." }
     """
-    require_api_key()
-    try:
-        data = request.get_json(force=True)
-        channel = data.get('channel_name')
-        if not channel:
-            return create_error_response(APIErrorCodes.MISSING_REQUIRED_FIELDS, "channel_name required", 400)
-            
-        get_gatekeeper_agent().unblock_channel(channel)
-        return jsonify({'success': True, 'message': f'Unblocked {channel}'}), 200
-    except Exception as e:
-         return create_error_response(APIErrorCodes.INTERNAL_ERROR, str(e), 500)
+    data = get_json_body()
+    missing = validate_required(data, REQUIRED_FIELDS['/gatekeeper/unblock_channel'])
+    if missing:
+        return missing_field_response(missing)
+    channel = data['channel_name']
+        
+    _gatekeeper_agent().unblock_channel(channel)
+    return json_response({'success': True, 'message': f'Unblocked {channel}'}), 200
 
 
 # ===== FIRESTORE ENDPOINTS: Persistent Storage =====
@@ -864,27 +1210,15 @@ def fs_get_sessions():
     Query params:
       - limit: max results (default 20)
     """
-    require_api_key()
-    try:
-        from firestore_service import get_recent_sessions
-        
-        limit = int(request.args.get('limit', 20))
-        sessions = get_recent_sessions(limit=limit)
-        
-        return jsonify({
-            'success': True,
-            'sessions': sessions,
-            'count': len(sessions)
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"/firestore/sessions GET error: {e}", exc_info=True)
-        return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Failed to retrieve sessions",
-            500,
-            {'error_details': str(e)}
-        )
+    limit = int(request.args.get('limit', 20))
+    sessions = fs.get_recent_sessions(limit=limit)
+    
+    return json_response({
+        'success': True,
+        'sessions': sessions,
+        'count': len(sessions)
+    }), 200
+
 
 @app.route('/firestore/sessions', methods=['POST'])
 def fs_save_session_endpoint():
@@ -901,43 +1235,28 @@ def fs_save_session_endpoint():
       "date": "2026-02-18"
     }
     """
-    require_api_key()
-    try:
-        from firestore_service import save_session
+    data = get_json_body() or {}
+    session_id = data.get('session_id')
+    missing = validate_required(data, REQUIRED_FIELDS['/firestore/sessions'])
+    if missing:
+        return missing_field_response(missing)
+
+    session_payload = {
+        'goal': data.get('goal', ''),
+        'focus_score': float(data.get('focus_score', 0) or 0),
+        'videos_watched': int(data.get('videos_watched', 0) or 0),
+        'highlights_count': int(data.get('highlights_count', 0) or 0),
+        'watch_time_minutes': int(data.get('watch_time_minutes', 0) or 0),
+        'date': data.get('date') or datetime.now().strftime('%Y-%m-%d'),
+        'created_at': data.get('created_at') or datetime.now().isoformat()
+    }
 
-        data = request.get_json(force=True) or {}
-        session_id = data.get('session_id')
-        if not session_id:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "session_id is required",
-                400,
-                {'missing_field': 'session_id'}
-            )
+    success = fs.save_session(session_id, session_payload)
+    if not success:
+        return json_response({'success': False, 'message': 'Failed to save session'}), 500
+
+    return json_response({'success': True, 'session_id': session_id}), 200
 
-        session_payload = {
-            'goal': data.get('goal', ''),
-            'focus_score': float(data.get('focus_score', 0) or 0),
-            'videos_watched': int(data.get('videos_watched', 0) or 0),
-            'highlights_count': int(data.get('highlights_count', 0) or 0),
-            'watch_time_minutes': int(data.get('watch_time_minutes', 0) or 0),
-            'date': data.get('date') or datetime.now().strftime('%Y-%m-%d'),
-            'created_at': data.get('created_at') or datetime.now().isoformat()
-        }
-
-        success = save_session(session_id, session_payload)
-        if not success:
-            return jsonify({'success': False, 'message': 'Failed to save session'}), 500
-
-        return jsonify({'success': True, 'session_id': session_id}), 200
-    except Exception as e:
-        logger.error(f"/firestore/sessions POST error: {e}", exc_info=True)
-        return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Failed to save session",
-            500,
-            {'error_details': str(e)}
-        )
 
 @app.route('/highlights', methods=['POST'])
 def save_highlight():
@@ -945,48 +1264,35 @@ def save_highlight():
     Save a highlight to Firestore.
     POST /highlights
     """
-    require_api_key()
-    try:
-        from firestore_service import save_highlight as fs_save_highlight
-        
-        data = request.get_json()
-        if not data:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "Request body is required",
-                400
-            )
-        
-        # Validate required fields
-        if not data.get('video_id') or data.get('timestamp') is None:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "video_id and timestamp are required",
-                400
-            )
-        
-        doc_id = fs_save_highlight(data)
-        
-        if doc_id:
-            return jsonify({
-                'success': True,
-                'highlight_id': doc_id,
-                'message': 'Highlight saved successfully'
-            }), 201
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Highlight saved locally only (Firestore not available)'
-            }), 200
-        
-    except Exception as e:
-        logger.error(f"/highlights POST error: {e}", exc_info=True)
+    data = get_json_body(silent=True)
+    if not data:
         return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Failed to save highlight",
-            500,
-            {'error_details': str(e)}
+            APIErrorCodes.MISSING_REQUIRED_FIELDS,
+            "Request body is required",
+            400
+        )
+    
+    # Validate required fields
+    if not data.get('video_id') or data.get('timestamp') is None:
+        return create_error_response(
+            APIErrorCodes.MISSING_REQUIRED_FIELDS,
+            "video_id and timestamp are required",
+            400
         )
+    
+    doc_id = fs.save_highlight(data)
+    
+    if doc_id:
+        return json_response({
+            'success': True,
+            'highlight_id': doc_id,
+            'message': 'Highlight saved successfully'
+        }), 201
+    else:
+        return json_response({
+            'success': False,
+            'message': 'Highlight saved locally only (Firestore not available)'
+        }), 200
 
 
 @app.route('/highlights', methods=['GET'])
@@ -998,29 +1304,17 @@ def get_highlights():
       - user_id: optional user ID filter
       - limit: max results (default 100)
     """
-    require_api_key()
-    try:
-        from firestore_service import get_highlights as fs_get_highlights
-        
-        user_id = request.args.get('user_id')
-        limit = int(request.args.get('limit', 100))
-        
-        highlights = fs_get_highlights(user_id=user_id, limit=limit)
-        
-        return jsonify({
-            'success': True,
-            'highlights': highlights,
-            'count': len(highlights)
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"/highlights GET error: {e}", exc_info=True)
-        return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Failed to retrieve highlights",
-            500,
-            {'error_details': str(e)}
-        )
+    user_id = request.args.get('user_id')
+    limit = int(request.args.get('limit', 100))
+    
+    highlights = fs.get_highlights(user_id=user_id, limit=limit)
+    
+    body = dumps_json({
+        'success': True,
+        'highlights': highlights,
+        'count': len(highlights)
+    })
+    return conditional_json_response(body)
 
 
 @app.route('/highlights/video/<video_id>', methods=['GET'])
@@ -1029,27 +1323,14 @@ def get_video_highlights(video_id):
     Get all highlights for a specific video.
     GET /highlights/video/<video_id>
     """
-    require_api_key()
-    try:
-        from firestore_service import get_highlights_for_video
-        
-        highlights = get_highlights_for_video(video_id)
-        
-        return jsonify({
-            'success': True,
-            'video_id': video_id,
-            'highlights': highlights,
-            'count': len(highlights)
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"/highlights/video error: {e}", exc_info=True)
-        return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Failed to retrieve video highlights",
-            500,
-            {'error_details': str(e)}
-        )
+    highlights = fs.get_highlights_for_video(video_id)
+    
+    return conditional_json_response(dumps_json({
+        'success': True,
+        'video_id': video_id,
+        'highlights': highlights,
+        'count': len(highlights)
+    }))
 
 
 @app.route('/highlights/<highlight_id>', methods=['DELETE'])
@@ -1058,117 +1339,186 @@ def delete_highlight(highlight_id):
     Delete a highlight.
     DELETE /highlights/<highlight_id>
     """
-    require_api_key()
+    success = fs.delete_highlight(highlight_id)
+    
+    if success:
+        return json_response({
+            'success': True,
+            'message': 'Highlight deleted'
+        }), 200
+    else:
+        return json_response({
+            'success': False,
+            'message': 'Highlight not found or deletion failed'
+        }), 404
+
+
+# --- Background jobs (backup/restore run past the request that starts them) ---
+# Status is kept in Firestore (fs.save_job_status), not in this process, so
+# polls work whichever worker or instance they reach.
+_job_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='jobs')
+
+def _submit_job(kind, fn):
+    """Run fn in the background; returns its task id, or None if its status can't be recorded."""
+    task_id = uuid.uuid4().hex
+    if not fs.save_job_status(task_id, {'kind': kind, 'status': 'pending', 'submitted_at': now_iso()}):
+        return None
+    _job_executor.submit(_run_job, task_id, fn)
+    return task_id
+
+def _run_job(task_id, fn):
+    fs.save_job_status(task_id, {'status': 'running'})
     try:
-        from firestore_service import delete_highlight as fs_delete_highlight
-        
-        success = fs_delete_highlight(highlight_id)
-        
-        if success:
-            return jsonify({
-                'success': True,
-                'message': 'Highlight deleted'
-            }), 200
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Highlight not found or deletion failed'
-            }), 404
-        
+        succeeded = bool(fn())
+        error = None
     except Exception as e:
-        logger.error(f"/highlights DELETE error: {e}", exc_info=True)
+        logger.error("Background job %s failed: %s", task_id, e)
+        succeeded, error = False, str(e)
+    fs.save_job_status(task_id, {
+        'status': 'succeeded' if succeeded else 'failed',
+        'finished_at': now_iso(),
+        'error': error
+    })
+
+def _job_unavailable_response():
+    return create_error_response(
+        APIErrorCodes.SERVICE_UNAVAILABLE,
+        "Job tracking unavailable",
+        503,
+        {'reason': 'Firestore not available to record job status'}
+    )
+
+def _job_status_response(kind, task_id):
+    job = fs.get_job_status(task_id)
+    if job is None or job.get('kind') != kind:
         return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Failed to delete highlight",
-            500,
-            {'error_details': str(e)}
+            APIErrorCodes.INVALID_PARAMETERS,
+            "Unknown task id",
+            404,
+            {'task_id': task_id}
         )
-
+    return json_response({
+        'task_id': task_id,
+        'status': job.get('status'),
+        'submitted_at': job.get('submitted_at'),
+        'finished_at': job.get('finished_at'),
+        'error': job.get('error')
+    }), 200
+
+def _run_restore():
+    success = fs.restore_chromadb_from_gcs()
+    if success:
+        _librarian_video_cache.clear()
+        _librarian_search_cache.clear()
+        # Reuse the shared librarian; only its cached reads are stale
+        _librarian_agent().reload()
+    return success
 
 @app.route('/backup/chromadb', methods=['POST'])
 def backup_chromadb():
     """
-    Backup ChromaDB to Google Cloud Storage.
+    Start a ChromaDB backup to Google Cloud Storage.
     POST /backup/chromadb
+    Returns 202 with a task id; poll GET /backup/chromadb/<task_id> for the result.
     """
-    require_api_key()
-    try:
-        from firestore_service import backup_chromadb_to_gcs
-        
-        success = backup_chromadb_to_gcs()
-        
-        if success:
-            return jsonify({
-                'success': True,
-                'message': 'ChromaDB backup completed'
-            }), 200
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Backup failed (check logs for details)'
-            }), 500
-        
-    except Exception as e:
-        logger.error(f"/backup/chromadb error: {e}", exc_info=True)
-        return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Failed to backup ChromaDB",
-            500,
-            {'error_details': str(e)}
-        )
+    task_id = _submit_job('backup', fs.backup_chromadb_to_gcs)
+    if task_id is None:
+        return _job_unavailable_response()
+
+    return json_response({
+        'success': True,
+        'task_id': task_id,
+        'status_url': f'/backup/chromadb/{task_id}',
+        'message': 'ChromaDB backup started'
+    }), 202
+
+
+@app.route('/backup/chromadb/<task_id>', methods=['GET'])
+def backup_chromadb_status(task_id):
+    """
+    Status of a backup started by POST /backup/chromadb.
+    GET /backup/chromadb/<task_id>
+    """
+    return _job_status_response('backup', task_id)
 
 
 @app.route('/restore/chromadb', methods=['POST'])
 def restore_chromadb():
     """
-    Restore ChromaDB from Google Cloud Storage.
+    Start a ChromaDB restore from Google Cloud Storage.
     POST /restore/chromadb
+    Returns 202 with a task id; poll GET /restore/chromadb/<task_id> for the result.
     """
-    require_api_key()
-    try:
-        from firestore_service import restore_chromadb_from_gcs
-        
-        success = restore_chromadb_from_gcs()
-        
-        if success:
-            # Reinitialize librarian to pick up restored data
-            from librarian_agent import LibrarianAgent
-            global _librarian_instance
-            _librarian_instance = LibrarianAgent()
-            
-            return jsonify({
-                'success': True,
-                'message': 'ChromaDB restored successfully'
-            }), 200
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Restore failed (no backup found or error occurred)'
-            }), 500
-        
-    except Exception as e:
-        logger.error(f"/restore/chromadb error: {e}", exc_info=True)
-        return create_error_response(
-            APIErrorCodes.INTERNAL_ERROR,
-            "Failed to restore ChromaDB",
-            500,
-            {'error_details': str(e)}
-        )
+    task_id = _submit_job('restore', _run_restore)
+    if task_id is None:
+        return _job_unavailable_response()
+
+    return json_response({
+        'success': True,
+        'task_id': task_id,
+        'status_url': f'/restore/chromadb/{task_id}',
+        'message': 'ChromaDB restore started'
+    }), 202
 
 
+@app.route('/restore/chromadb/<task_id>', methods=['GET'])
+def restore_chromadb_status(task_id):
+    """
+    Status of a restore started by POST /restore/chromadb.
+    GET /restore/chromadb/<task_id>
+    """
+    return _job_status_response('restore', task_id)
+
+
+# Client-facing message per endpoint when a handler raises unexpectedly
+_ENDPOINT_ERROR_MESSAGES = {
+    'score_endpoint': "Internal server error during simple scoring",
+    'librarian_index': "Librarian indexing failed",
+    'librarian_search': "Librarian search failed",
+    'librarian_get_or_delete_video': "Failed to process video request",
+    'librarian_stats': "Failed to retrieve stats",
+    'librarian_chat': "Librarian chat failed",
+    'navigator_get_chapters': "Navigator chapters failed",
+    'gatekeeper_filter': "Gatekeeper filtering failed",
+    'gatekeeper_block_channel': "Failed to block channel",
+    'gatekeeper_unblock_channel': "Failed to unblock channel",
+    'fs_get_sessions': "Failed to retrieve sessions",
+    'fs_save_session_endpoint': "Failed to save session",
+    'save_highlight': "Failed to save highlight",
+    'get_highlights': "Failed to retrieve highlights",
+    'get_video_highlights': "Failed to retrieve video highlights",
+    'delete_highlight': "Failed to delete highlight",
+    'backup_chromadb': "Failed to start ChromaDB backup",
+    'backup_chromadb_status': "Failed to read backup status",
+    'restore_chromadb': "Failed to start ChromaDB restore",
+    'restore_chromadb_status': "Failed to read restore status",
+    'librarian_save_item': "Save failed",
+    'librarian_save_summary': "Save summary failed",
+}
+
 # Global error handler for unhandled exceptions
 @app.errorhandler(Exception)
 def handle_unexpected_error(error):
-    logger.error(f"Unhandled exception: {error}", exc_info=True)
+    # Let HTTP errors (e.g. 429 from the rate limiter) keep their status code
+    if isinstance(error, HTTPException):
+        return error
+    logger.error("%s error: %s", request.path, error, exc_info=sample_exc_info())
     return create_error_response(
         APIErrorCodes.INTERNAL_ERROR,
-        "An unexpected error occurred",
+        _ENDPOINT_ERROR_MESSAGES.get(request.endpoint, "An unexpected error occurred"),
         500,
         {'error_type': type(error).__name__, 'error_details': str(error)}
     )
 
 # Handle structured API errors consistently as JSON
 
+# --- /librarian/save de-duplication ---
+_SAVE_DEDUP_TTL = 10  # seconds
+_SAVE_WAIT_TIMEOUT = 120  # matches the gunicorn worker timeout
+_recent_saves = ResponseCache(ttl_seconds=_SAVE_DEDUP_TTL)  # {(video_id, goal, mode): body}
+_saves_in_flight = {}  # {(video_id, goal, mode): threading.Event}
+_saves_lock = threading.Lock()
+
 @app.route('/librarian/save', methods=['POST'])
 def librarian_save_item():
     """
@@ -1184,34 +1534,45 @@ def librarian_save_item():
       "description": "..."   # required if transcript missing
     }
     """
-    require_api_key()
-    try:
-        data = request.get_json(force=True)
-        video_id = data.get('video_id')
-        title = data.get('title')
-        goal = data.get('goal')
-        score = data.get('score', 100)
-        video_url = data.get('video_url', '')
-        transcript = data.get('transcript', '')
-        description = data.get('description', '')
+    data = get_json_body()
+    video_id = data.get('video_id')
+    title = data.get('title')
+    goal = data.get('goal')
+    score = data.get('score', 100)
+    video_url = data.get('video_url', '')
+    transcript = data.get('transcript', '')
+    description = data.get('description', '')
+
+    if validate_required(data, REQUIRED_FIELDS['/librarian/save']):
+        return create_error_response(
+            APIErrorCodes.MISSING_REQUIRED_FIELDS,
+            "video_id, title, and goal are required",
+            400,
+            {'missing_field': 'video_id/title/goal'}
+        )
 
-        if not video_id or not title or not goal:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "video_id, title, and goal are required",
-                400,
-                {'missing_field': 'video_id/title/goal'}
-            )
+    if not transcript and not description:
+        return create_error_response(
+            APIErrorCodes.MISSING_REQUIRED_FIELDS,
+            "description is required when transcript is unavailable",
+            400,
+            {'missing_field': 'description'}
+        )
 
-        if not transcript and not description:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "description is required when transcript is unavailable",
-                400,
-                {'missing_field': 'description'}
-            )
+    # Repeated saves (double-click, duplicated tab) reuse the first save's result
+    save_key = (video_id, goal, 'transcript' if transcript else 'link_only')
+    with _saves_lock:
+        in_flight = _saves_in_flight.get(save_key)
+        if in_flight is None:
+            _saves_in_flight[save_key] = threading.Event()
+    if in_flight is not None:
+        in_flight.wait(timeout=_SAVE_WAIT_TIMEOUT)
+    cached = _recent_saves.get(save_key)
+    if cached is not None:
+        return cached_json_response(cached, 'HIT'), 200
 
-        librarian = get_librarian_agent()
+    try:
+        librarian = _librarian_agent()
         result = librarian.save_video_item(
             video_id=video_id,
             title=title,
@@ -1222,22 +1583,30 @@ def librarian_save_item():
             description=description,
             segments=data.get('segments')  # timestamped segments for hierarchical chunking
         )
-
         if result.get('success'):
-            return jsonify({
+            _librarian_search_cache.clear()
+            _recent_saves.set(save_key, dumps_json({
                 'success': True,
-                'message': 'Video saved',
+                'message': 'Video saved (deduped)',
                 'save_mode': result.get('save_mode')
-            }), 200
+            }))
+    finally:
+        if in_flight is None:
+            with _saves_lock:
+                _saves_in_flight.pop(save_key).set()
+
+    if result.get('success'):
+        return json_response({
+            'success': True,
+            'message': 'Video saved',
+            'save_mode': result.get('save_mode')
+        }), 200
 
-        return jsonify({
-            'success': False,
-            'error': result.get('error', 'Failed to save')
-        }), 500
+    return json_response({
+        'success': False,
+        'error': result.get('error', 'Failed to save')
+    }), 500
 
-    except Exception as e:
-        logger.error(f"/librarian/save error: {e}", exc_info=True)
-        return create_error_response(APIErrorCodes.INTERNAL_ERROR, "Save failed", 500, {'error': str(e)})
 
 @app.route('/librarian/save_summary', methods=['POST'])
 def librarian_save_summary():
@@ -1253,45 +1622,41 @@ def librarian_save_summary():
       "video_url": "..."
     }
     """
-    require_api_key()
-    try:
-        data = request.get_json(force=True)
-        video_id = data.get('video_id')
-        title = data.get('title')
-        goal = data.get('goal')
-        summary = data.get('summary')
-        source = data.get('source', 'youtube_ask')
-        video_url = data.get('video_url', '')
-
-        if not video_id or not title or not goal or not summary:
-            return create_error_response(
-                APIErrorCodes.MISSING_REQUIRED_FIELDS,
-                "video_id, title, goal, and summary are required",
-                400,
-                {'missing_field': 'video_id/title/goal/summary'}
-            )
-
-        librarian = get_librarian_agent()
-        save_result = librarian.save_video_summary(
-            video_id=video_id,
-            title=title,
-            user_goal=goal,
-            summary=summary,
-            preset=source,
-            video_url=video_url
+    data = get_json_body()
+    video_id = data.get('video_id')
+    title = data.get('title')
+    goal = data.get('goal')
+    summary = data.get('summary')
+    source = data.get('source', 'youtube_ask')
+    video_url = data.get('video_url', '')
+
+    if validate_required(data, REQUIRED_FIELDS['/librarian/save_summary']):
+        return create_error_response(
+            APIErrorCodes.MISSING_REQUIRED_FIELDS,
+            "video_id, title, goal, and summary are required",
+            400,
+            {'missing_field': 'video_id/title/goal/summary'}
         )
-        if not save_result.get('success'):
-            return jsonify({'success': False, 'error': save_result.get('error', 'Failed to save summary')}), 500
 
-        return jsonify({
-            'success': True,
-            'message': 'Summary saved',
-            'source': source
-        }), 200
+    librarian = _librarian_agent()
+    save_result = librarian.save_video_summary(
+        video_id=video_id,
+        title=title,
+        user_goal=goal,
+        summary=summary,
+        preset=source,
+        video_url=video_url
+    )
+    if not save_result.get('success'):
+        return json_response({'success': False, 'error': save_result.get('error', 'Failed to save summary')}), 500
+    _librarian_search_cache.clear()
+
+    return json_response({
+        'success': True,
+        'message': 'Summary saved',
+        'source': source
+    }), 200
 
-    except Exception as e:
-        logger.error(f"/librarian/save_summary error: {e}", exc_info=True)
-        return create_error_response(APIErrorCodes.INTERNAL_ERROR, "Save summary failed", 500, {'error': str(e)})
 
 @app.route('/librarian/saved_videos', methods=['GET'])
 def librarian_get_saved_videos():
@@ -1299,17 +1664,13 @@ def librarian_get_saved_videos():
     Get manually saved videos.
     GET /librarian/saved_videos
     """
-    require_api_key()
     try:
-        librarian = get_librarian_agent()
-        if not librarian:
-             return jsonify({'success': True, 'videos': []}), 200
-
-        videos = librarian.get_saved_videos(limit=50)
-        return jsonify({'success': True, 'videos': videos}), 200
+        videos = _librarian_agent().get_saved_videos(limit=50)
+        body = dumps_json({'success': True, 'videos': videos})
+        return conditional_json_response(body)
     except Exception as e:
-        logger.error(f"/librarian/saved_videos error: {e}", exc_info=True)
-        return jsonify({'success': False, 'videos': [], 'error': str(e)}), 200
+        logger.error("/librarian/saved_videos error: %s", e, exc_info=sample_exc_info())
+        return json_response({'success': False, 'videos': [], 'error': str(e)}), 200
 
 @app.route('/librarian/get_highlights', methods=['GET'])
 def librarian_get_highlights():
@@ -1317,19 +1678,15 @@ def librarian_get_highlights():
     Get recent highlights from all videos.
     GET /librarian/get_highlights
     """
-    require_api_key()
     try:
-        librarian = get_librarian_agent()
-        if not librarian:
-            # If librarian fails to init (e.g. no Firestore), return empty list instead of crashing
-            return jsonify({'success': True, 'highlights': []}), 200
-            
-        highlights = librarian.get_all_highlights(limit=50)
-        return jsonify({'success': True, 'highlights': highlights}), 200
+        # Same query as GET /highlights; returns [] when Firestore is unavailable
+        highlights = fs.get_highlights(limit=50)
+        body = dumps_json({'success': True, 'highlights': highlights})
+        return conditional_json_response(body)
     except Exception as e:
-        logger.error(f"/librarian/get_highlights error: {e}", exc_info=True)
+        logger.error("/librarian/get_highlights error: %s", e, exc_info=sample_exc_info())
         # return empty list on error to prevent frontend crash
-        return jsonify({'success': False, 'highlights': [], 'error': str(e)}), 200
+        return json_response({'success': False, 'highlights': [], 'error': str(e)}), 200
 
 @app.route('/librarian/summaries', methods=['GET'])
 def librarian_get_saved_summaries():
@@ -1337,22 +1694,35 @@ def librarian_get_saved_summaries():
     Get saved summaries.
     GET /librarian/summaries
     """
-    require_api_key()
     try:
-        librarian = get_librarian_agent()
-        if not librarian:
-             return jsonify({'success': True, 'summaries': []}), 200
-
-        summaries = librarian.get_saved_summaries(limit=50)
-        return jsonify({'success': True, 'summaries': summaries}), 200
+        summaries = _librarian_agent().get_saved_summaries(limit=50)
+        body = dumps_json({'success': True, 'summaries': summaries})
+        return conditional_json_response(body)
     except Exception as e:
-        logger.error(f"/librarian/summaries error: {e}", exc_info=True)
-        return jsonify({'success': False, 'summaries': [], 'error': str(e)}), 200
+        logger.error("/librarian/summaries error: %s", e, exc_info=sample_exc_info())
+        return json_response({'success': False, 'summaries': [], 'error': str(e)}), 200
 
 @app.errorhandler(APIError)
 def handle_api_error(error):
     return create_error_response(error.error_code, error.message, error.http_status, error.details)
 
+# Public endpoints advertised in 404 responses (shared, never rebuilt per request)
+_AVAILABLE_ENDPOINTS = (
+    '/health', '/score', '/feedback', '/transcript/<video_id>', '/coach/analyze',
+    '/librarian/index', '/librarian/search', '/librarian/video/<video_id>', '/librarian/stats',
+    '/librarian/save', '/librarian/save_summary', '/librarian/summaries', '/highlights',
+)
+
+# 400 handler for malformed or non-object JSON bodies (raised by get_json_body)
+@app.errorhandler(400)
+def bad_request(error):
+    return create_error_response(
+        APIErrorCodes.INVALID_PARAMETERS,
+        "Invalid JSON body",
+        400,
+        {'error_details': error.description}
+    )
+
 # 404 handler for undefined routes
 @app.errorhandler(404)
 def not_found(error):
@@ -1360,22 +1730,40 @@ def not_found(error):
         APIErrorCodes.INTERNAL_ERROR,
         "Endpoint not found",
         404,
-        {'requested_url': request.url, 'available_endpoints': ['/health', '/score', '/feedback', '/transcript/<video_id>', '/coach/analyze', '/librarian/index', '/librarian/search', '/librarian/video/<video_id>', '/librarian/stats', '/librarian/save', '/librarian/save_summary', '/librarian/summaries', '/highlights']}
+        {'requested_url': request.url, 'available_endpoints': _AVAILABLE_ENDPOINTS}
     )
 
+# 413 handler for request bodies over MAX_CONTENT_LENGTH
+@app.errorhandler(413)
+def payload_too_large(error):
+    return create_error_response(
+        APIErrorCodes.PAYLOAD_TOO_LARGE,
+        "Request body too large",
+        413,
+        {'max_content_length': app.config['MAX_CONTENT_LENGTH'], 'content_length': request.content_length}
+    )
+
+_DEFAULT_ALLOWED_METHODS = ('GET', 'POST')
+
 # 405 handler for method not allowed
 @app.errorhandler(405)
 def method_not_allowed(error):
-    return create_error_response(
+    # Werkzeug already matched the route, so it knows the methods it accepts
+    allowed_methods = tuple(getattr(error, 'valid_methods', None) or _DEFAULT_ALLOWED_METHODS)
+    response, status = create_error_response(
         APIErrorCodes.INVALID_PARAMETERS,
         "Method not allowed",
         405,
-        {'method': request.method, 'endpoint': request.path, 'allowed_methods': ['GET', 'POST']}
+        {'method': request.method, 'endpoint': request.path, 'allowed_methods': allowed_methods}
     )
+    response.headers['Allow'] = ', '.join(allowed_methods)
+    return response, status
 
 
 if __name__ == '__main__':
-    logger.info(f"Starting TubeFocus API server...")
-    logger.info(f"Environment: {Config.ENVIRONMENT}")
-    logger.info(f"Debug mode: {Config.DEBUG}")
-    app.run(host='0.0.0.0', port=Config.PORT, debug=Config.DEBUG)
+    logger.info("Starting TubeFocus API server...")
+    logger.info("Environment: %s", Config.ENVIRONMENT)
+    logger.info("Debug mode: %s", Config.DEBUG)
+    if not Config.DEBUG:
+        logger.warning("Running the Flask development server; use `gunicorn api:app` in production")
+    app.run(host='0.0.0.0', port=Config.PORT, debug=Config.DEBUG, threaded=True)
@@ -1,8 +1,14 @@
-from google import genai
 import logging
 import json
 import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import orjson
 from youtube_client import get_video_comments
+from gemini_client import get_gemini_client
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -11,6 +17,53 @@ logger = logging.getLogger(__name__)
 # Configure Gemini API
 GOOGLE_API_KEY = os.environ.get('GOOGLE_API_KEY')
 
+# Analysis cache bounds: comments change slowly, so a day-old verdict is still useful
+AUDIT_CACHE_TTL = 86400  # 24 hours
+AUDIT_CACHE_MAX_SIZE = 10000
+
+# Leading/trailing Markdown code fences Gemini sometimes wraps its JSON in
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$')
+
+# Built with str.format; literal JSON braces are doubled
+_COMMUNITY_AUDIT_PROMPT = """You are an expert Community Auditor. specificially analyzing YouTube comments to verify if a video is worth watching or dangerous/outdated.
+
+VIDEO TITLE: {title}
+USER GOAL: {goal}
+
+COMMENTS FROM THE COMMUNITY:
+{comments}
+
+YOUR TASK:
+Perform a "Community Wisdom Analysis" to find the truth about this video.
+
+1. FILTER NOISE: Ignore "First!", "Great vid", "Love you" type comments.
+2. DETECT DEALBREAKERS (Crucial):
+   - Freshness: Do people say "This is outdated in 2025", "Deprecated", "Doesn't work anymore"?
+   - Safety: "Don't run this code", "Virus", "Deletes database"?
+   - Deception: "Clickbait", "Title is a lie", "Video is just an ad"?
+   - Quality: "Audio is terrible", "Can't read screen", "Annoying voice" (differentiate from content quality).
+3. EXTRACT VALUE SIGNALS:
+   - "Skipped to 4:20 for the fix".
+   - "This worked perfectly for Error X".
+   - "Better than the documentation".
+
+RETURN VALID JSON ONLY:
+{{
+  "community_verdict": <0-100 score. 0=Dangerous/Broken, 50=Mixed/Average, 100=Gold Standard>,
+  "verdict_badge": "<One of: 'Community Verified', 'Outdated', 'Controversial', 'Mixed', 'Clickbait', 'Warning'>",
+  "summary": "<1 sentence summary of what the comments say>",
+  "critical_warnings": ["<specific warning 1>", "<specific warning 2>"],
+  "useful_tips": ["<timestamp or tip 1>", "<tip 2>"],
+  "pros": ["<pro 1>", "<pro 2>"],
+  "cons": ["<con 1>", "<con 2>"]
+}}
+
+IMPORTANT:
+- If comments say it's OUTDATED or BROKEN, score MUST be low (<40).
+- If comments are mostly "I have the same problem and this didn't fix it", score low.
+- If audio/video quality is bad but info is good, score ~60-70 but note it.
+"""
+
 class AuditorAgent:
     """
     The Auditor Agent - Community Wisdom & Quality Verification
@@ -21,11 +74,12 @@ class AuditorAgent:
     """
     
     def __init__(self):
-        self.cache = {}  # In-memory cache for analysis results
+        self.cache = OrderedDict()  # {video_id:goal: (analysis, expires_at)}, least recently used first
+        self._cache_lock = threading.Lock()
         self.model_name = 'gemini-2.0-flash'
         self.client = None
         if GOOGLE_API_KEY:
-             self.client = genai.Client(api_key=GOOGLE_API_KEY)
+             self.client = get_gemini_client()
         logger.info("Auditor Agent initialized (Comment Analysis Mode)")
     
     def analyze_content(self, video_id, title, description, goal, transcript=None):
@@ -42,93 +96,58 @@ class AuditorAgent:
         Returns:
             dict: Analysis results with community verdict.
         """
-        # Check cache first
-        cache_key = f"{video_id}"
-        if cache_key in self.cache:
-            logger.info(f"Returning cached analysis for {video_id}")
-            return self.cache[cache_key]
+        # Check cache first (the verdict is goal-specific, so the goal is part of the key)
+        cache_key = f"{video_id}:{goal}"
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            logger.info("Returning cached analysis for %s", video_id)
+            return cached
         
         try:
             # Fetch comments (The "Community Wisdom")
             comments = get_video_comments(video_id, max_results=30)
             
             if not comments:
-                logger.info(f"No comments found for {video_id}, returning neutral verdict")
+                logger.info("No comments found for %s, returning neutral verdict", video_id)
                 return self._get_neutral_verdict(reason="No comments available to verify this video.")
             
             # Agent reasons: analyze comments deeply
             analysis = self._analyze_community_wisdom(title, comments, goal)
             
-            # Cache the result
-            self.cache[cache_key] = analysis
+            # Only cache real verdicts; a failed Gemini call should be retried next time
+            if analysis.get('status') == 'success':
+                self._set_cached(cache_key, analysis)
             
-            logger.info(f"Auditor analysis complete for {video_id}: verdict={analysis['community_verdict']}")
+            logger.info("Auditor analysis complete for %s: verdict=%s", video_id, analysis['community_verdict'])
             
             return analysis
             
         except Exception as e:
-            logger.error(f"Auditor analysis failed for {video_id}: {str(e)}")
+            logger.error("Auditor analysis failed for %s: %s", video_id, e)
             return self._get_error_verdict(str(e))
     
     def _analyze_community_wisdom(self, title, comments, goal):
         """Use Gemini to perform deep analysis of comments."""
         
-        prompt = f"""You are an expert Community Auditor. specificially analyzing YouTube comments to verify if a video is worth watching or dangerous/outdated.
-
-VIDEO TITLE: {title}
-USER GOAL: {goal}
-
-COMMENTS FROM THE COMMUNITY:
-{json.dumps(comments, indent=2)}
-
-YOUR TASK:
-Perform a "Community Wisdom Analysis" to find the truth about this video.
-
-1. FILTER NOISE: Ignore "First!", "Great vid", "Love you" type comments.
-2. DETECT DEALBREAKERS (Crucial):
-   - Freshness: Do people say "This is outdated in 2025", "Deprecated", "Doesn't work anymore"?
-   - Safety: "Don't run this code", "Virus", "Deletes database"?
-   - Deception: "Clickbait", "Title is a lie", "Video is just an ad"?
-   - Quality: "Audio is terrible", "Can't read screen", "Annoying voice" (differentiate from content quality).
-3. EXTRACT VALUE SIGNALS:
-   - "Skipped to 4:20 for the fix".
-   - "This worked perfectly for Error X".
-   - "Better than the documentation".
-
-RETURN VALID JSON ONLY:
-{{
-  "community_verdict": <0-100 score. 0=Dangerous/Broken, 50=Mixed/Average, 100=Gold Standard>,
-  "verdict_badge": "<One of: 'Community Verified', 'Outdated', 'Controversial', 'Mixed', 'Clickbait', 'Warning'>",
-  "summary": "<1 sentence summary of what the comments say>",
-  "critical_warnings": ["<specific warning 1>", "<specific warning 2>"],
-  "useful_tips": ["<timestamp or tip 1>", "<tip 2>"],
-  "pros": ["<pro 1>", "<pro 2>"],
-  "cons": ["<con 1>", "<con 2>"]
-}}
-
-IMPORTANT:
-- If comments say it's OUTDATED or BROKEN, score MUST be low (<40).
-- If comments are mostly "I have the same problem and this didn't fix it", score low.
-- If audio/video quality is bad but info is good, score ~60-70 but note it.
-"""
+        prompt = _COMMUNITY_AUDIT_PROMPT.format(
+            title=title, goal=goal, comments=json.dumps(comments, indent=2)
+        )
 
         try:
             if not self.client:
                 raise ValueError("GOOGLE_API_KEY not configured")
             
+            # JSON mode: Gemini returns bare JSON (the fence strip is just a fallback)
             response = self.client.models.generate_content(
                 model=self.model_name,
-                contents=prompt
+                contents=prompt,
+                config={
+                    'response_mime_type': 'application/json'
+                }
             )
             
             # Parse response
-            text = response.text.strip()
-            if text.startswith('```json'):
-                text = text.replace('```json', '').replace('```', '')
-            elif text.startswith('```'):
-                text = text.replace('```', '')
-            
-            result = json.loads(text)
+            result = orjson.loads(_FENCE_RE.sub('', response.text))
             
             # Normalize and return
             return {
@@ -144,7 +163,7 @@ IMPORTANT:
             }
             
         except Exception as e:
-            logger.error(f"Gemini analysis error: {str(e)}")
+            logger.error("Gemini analysis error: %s", e)
             return self._get_error_verdict(str(e))
             
     def _get_neutral_verdict(self, reason):
@@ -168,9 +187,29 @@ IMPORTANT:
             'status': 'error'
         }
 
+    def _get_cached(self, cache_key):
+        with self._cache_lock:
+            entry = self.cache.get(cache_key)
+            if entry is None:
+                return None
+            analysis, expires_at = entry
+            if time.time() >= expires_at:
+                del self.cache[cache_key]
+                return None
+            self.cache.move_to_end(cache_key)
+            return analysis
+
+    def _set_cached(self, cache_key, analysis):
+        with self._cache_lock:
+            self.cache[cache_key] = (analysis, time.time() + AUDIT_CACHE_TTL)
+            self.cache.move_to_end(cache_key)
+            while len(self.cache) > AUDIT_CACHE_MAX_SIZE:
+                self.cache.popitem(last=False)
+
     def clear_cache(self):
         """Clear the analysis cache."""
-        self.cache = {}
+        with self._cache_lock:
+            self.cache.clear()
         logger.info("Auditor cache cleared")
 
 # Global instance
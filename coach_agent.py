@@ -1,9 +1,9 @@
-from google import genai
 import logging
 import json
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
+from gemini_client import get_gemini_client
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -12,6 +12,14 @@ logger = logging.getLogger(__name__)
 # Configure Gemini API
 GOOGLE_API_KEY = os.environ.get('GOOGLE_API_KEY')
 
+# Mode-specific thresholds for pattern analysis
+COACH_MODE_THRESHOLDS = {
+    'strict': {'low_score': 50, 'max_distractions': 1},
+    'balanced': {'low_score': 40, 'max_distractions': 3},
+    'relaxed': {'low_score': 30, 'max_distractions': 5},
+    'custom': {'low_score': 40, 'max_distractions': 3}
+}
+
 
 class CoachAgent:
     """
@@ -34,7 +42,7 @@ class CoachAgent:
         self.model_name = 'gemini-2.0-flash'
         self.client = None
         if GOOGLE_API_KEY:
-            self.client = genai.Client(api_key=GOOGLE_API_KEY)
+            self.client = get_gemini_client()
         logger.info("Coach Agent initialized")
     
     def start_session(self, session_id: str, goal: str, coach_mode: str = 'balanced',
@@ -66,7 +74,7 @@ class CoachAgent:
             'got_back_on_track': False,  # Flag to track if user improved after distraction
             'seen_event_keys': set()
         }
-        logger.info(f"Coach started session {session_id} with mode: {coach_mode}")
+        logger.info("Coach started session %s with mode: %s", session_id, coach_mode)
         
         return {
             'message': self._get_session_start_message(goal, coach_mode),
@@ -275,15 +283,7 @@ class CoachAgent:
         coach_mode = session.get('coach_mode', 'balanced')
         goal = session.get('goal', '')
         
-        # Mode-specific thresholds
-        thresholds = {
-            'strict': {'low_score': 50, 'max_distractions': 1},
-            'balanced': {'low_score': 40, 'max_distractions': 3},
-            'relaxed': {'low_score': 30, 'max_distractions': 5},
-            'custom': {'low_score': 40, 'max_distractions': 3}
-        }
-        
-        threshold = thresholds.get(coach_mode, thresholds['balanced'])
+        threshold = COACH_MODE_THRESHOLDS.get(coach_mode, COACH_MODE_THRESHOLDS['balanced'])
         
         # Count low-score videos
         low_score_count = sum(1 for s in scores if s < threshold['low_score'])
@@ -411,7 +411,7 @@ Return ONLY valid JSON:
             }
             
         except Exception as e:
-            logger.error(f"Comment analysis failed: {str(e)}")
+            logger.error("Comment analysis failed: %s", e)
             return None
     
     def update_watch_status(self, session_id: str, is_watching: bool, 
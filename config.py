@@ -27,7 +27,13 @@ class Config:
     # ===== Rate Limiting =====
     RATELIMIT_DEFAULT = os.environ.get('RATELIMIT_DEFAULT', '200 per day;50 per hour')
     RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL', 'memory://')
+    # Use 'moving-window' with a redis+zset:// storage URL (see rate_limit_storage.py)
+    RATELIMIT_STRATEGY = os.environ.get('RATELIMIT_STRATEGY', 'fixed-window')
     
+    # ===== Request Limits =====
+    # Hard ceiling on request bodies (long-video transcripts are the largest payloads)
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', str(4 * 1024 * 1024)))
+
     # ===== Redis Configuration - Removed (Not needed) =====
     # Redis integration removed in favor of simplified architecture
     REDIS_HOST = None
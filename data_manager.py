@@ -1,6 +1,8 @@
 import csv
 import os
 
+import numpy as np
+
 FEEDBACK_FILE = 'feedback_data.csv'
 
 FEATURE_NAMES = ['desc_score', 'title_score', 'tags_score', 'category_score', 'user_score']
@@ -18,4 +20,16 @@ def load_feedback():
         return []
     with open(FEEDBACK_FILE, 'r') as f:
         reader = csv.DictReader(f)
-        return list(reader) 
\ No newline at end of file
+        return list(reader) 
+
+def load_feedback_arrays():
+    """
+    Feedback as training arrays: X is (N, 4) feature scores, y is (N,) user scores.
+    Parsed straight from the CSV by numpy instead of going through per-row dicts.
+    """
+    if not os.path.exists(FEEDBACK_FILE):
+        return np.empty((0, 4)), np.empty(0)
+    data = np.loadtxt(FEEDBACK_FILE, delimiter=',', skiprows=1, ndmin=2)
+    if data.size == 0:
+        return np.empty((0, 4)), np.empty(0)
+    return data[:, :4], data[:, 4]
@@ -5,7 +5,9 @@ Provides persistent storage for highlights, user data, and video metadata.
 
 import os
 import logging
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 
 # Setup logging
@@ -15,6 +17,7 @@ logger = logging.getLogger(__name__)
 # Firebase initialization
 _firestore_client = None
 _initialized = False
+_firestore_lock = threading.Lock()
 
 def initialize_firestore():
     """Initialize Firestore client."""
@@ -43,7 +46,7 @@ def initialize_firestore():
                 if cred_path and os.path.exists(cred_path):
                     cred = credentials.Certificate(cred_path)
                     firebase_admin.initialize_app(cred)
-                    logger.info(f"Firestore initialized with service account: {cred_path}")
+                    logger.info("Firestore initialized with service account: %s", cred_path)
                 else:
                     # Try default credentials anyway
                     firebase_admin.initialize_app()
@@ -55,19 +58,54 @@ def initialize_firestore():
         return _firestore_client
         
     except Exception as e:
-        logger.error(f"Failed to initialize Firestore: {str(e)}")
+        logger.error("Failed to initialize Firestore: %s", e)
         _initialized = False
         return None
 
 
 def get_firestore():
-    """Get or create Firestore client."""
+    """Get or create the shared Firestore client (one per process)."""
     global _firestore_client
     if _firestore_client is None:
-        initialize_firestore()
+        with _firestore_lock:
+            if _firestore_client is None:
+                initialize_firestore()
     return _firestore_client
 
 
+# ===== READ CACHE =====
+# Highlight, session and librarian listings are polled far more often than they change.
+# This is the only listing cache; callers outside this module use get/set_cached_query.
+# Successful reads are kept for QUERY_CACHE_TTL seconds; every write clears the cache,
+# but only in the worker that handled it, so the short TTL bounds staleness elsewhere.
+QUERY_CACHE_TTL = 15
+QUERY_CACHE_MAX_SIZE = 512
+_query_cache = {}  # {(query_name, *args): (results, timestamp)}
+_query_cache_lock = threading.Lock()
+
+def get_cached_query(key):
+    with _query_cache_lock:
+        entry = _query_cache.get(key)
+        if entry is None:
+            return None
+        results, ts = entry
+        if time.time() - ts > QUERY_CACHE_TTL:
+            del _query_cache[key]
+            return None
+        return list(results)
+
+def set_cached_query(key, results):
+    with _query_cache_lock:
+        if len(_query_cache) >= QUERY_CACHE_MAX_SIZE:
+            _query_cache.pop(next(iter(_query_cache)))
+        _query_cache[key] = (results, time.time())
+
+def clear_query_cache():
+    """Drop all cached reads (called after any write, here or in the librarian)."""
+    with _query_cache_lock:
+        _query_cache.clear()
+
+
 # ===== HIGHLIGHTS COLLECTION =====
 
 def save_highlight(highlight: Dict) -> Optional[str]:
@@ -113,18 +151,32 @@ def save_highlight(highlight: Dict) -> Optional[str]:
         
         # Save to Firestore
         db.collection('highlights').document(doc_id).set(highlight_doc, merge=True)
+        clear_query_cache()
         
-        logger.info(f"Highlight saved: {doc_id}")
+        logger.info("Highlight saved: %s", doc_id)
         return doc_id
         
     except Exception as e:
-        logger.error(f"Failed to save highlight: {str(e)}")
+        logger.error("Failed to save highlight: %s", e)
         return None
 
 
+def _highlight_from_doc(doc) -> Dict:
+    """Highlight dict with its document id and a display range label."""
+    data = doc.to_dict() or {}
+    data['id'] = doc.id
+    if not data.get('range_label'):
+        start = data.get('timestamp_formatted') or str(data.get('timestamp', ''))
+        end = data.get('end_timestamp_formatted') or str(data.get('end_timestamp', data.get('timestamp', '')))
+        data['range_label'] = f"{start} - {end}" if start and end else start
+    return data
+
+
 def get_highlights(user_id: Optional[str] = None, limit: int = 100) -> List[Dict]:
     """
-    Get all highlights, optionally filtered by user.
+    Get the most recent highlights, optionally filtered by user.
+    Single query path for /highlights, /librarian/get_highlights and the
+    librarian's inventory answers.
     
     Args:
         user_id: Optional user ID to filter by
@@ -137,6 +189,11 @@ def get_highlights(user_id: Optional[str] = None, limit: int = 100) -> List[Dict
     if not db:
         return []
     
+    cache_key = ('highlights', user_id, limit)
+    cached = get_cached_query(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
         query = db.collection('highlights')
         
@@ -146,10 +203,12 @@ def get_highlights(user_id: Optional[str] = None, limit: int = 100) -> List[Dict
         query = query.order_by('created_at', direction='DESCENDING').limit(limit)
         
         docs = query.stream()
-        return [{'id': doc.id, **doc.to_dict()} for doc in docs]
+        results = [_highlight_from_doc(doc) for doc in docs]
+        set_cached_query(cache_key, results)
+        return results
         
     except Exception as e:
-        logger.error(f"Failed to get highlights: {str(e)}")
+        logger.error("Failed to get highlights: %s", e)
         return []
 
 
@@ -159,16 +218,23 @@ def get_highlights_for_video(video_id: str) -> List[Dict]:
     if not db:
         return []
     
+    cache_key = ('highlights_for_video', video_id)
+    cached = get_cached_query(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
         docs = db.collection('highlights') \
             .where('video_id', '==', video_id) \
             .order_by('timestamp') \
             .stream()
         
-        return [{'id': doc.id, **doc.to_dict()} for doc in docs]
+        results = [{'id': doc.id, **doc.to_dict()} for doc in docs]
+        set_cached_query(cache_key, results)
+        return results
         
     except Exception as e:
-        logger.error(f"Failed to get highlights for video {video_id}: {str(e)}")
+        logger.error("Failed to get highlights for video %s: %s", video_id, e)
         return []
 
 
@@ -180,10 +246,11 @@ def delete_highlight(doc_id: str) -> bool:
     
     try:
         db.collection('highlights').document(doc_id).delete()
-        logger.info(f"Highlight deleted: {doc_id}")
+        clear_query_cache()
+        logger.info("Highlight deleted: %s", doc_id)
         return True
     except Exception as e:
-        logger.error(f"Failed to delete highlight {doc_id}: {str(e)}")
+        logger.error("Failed to delete highlight %s: %s", doc_id, e)
         return False
 
 
@@ -206,7 +273,7 @@ def save_video_metadata(video_id: str, metadata: Dict) -> bool:
         return True
         
     except Exception as e:
-        logger.error(f"Failed to save video metadata: {str(e)}")
+        logger.error("Failed to save video metadata: %s", e)
         return False
 
 
@@ -223,7 +290,7 @@ def get_video_metadata(video_id: str) -> Optional[Dict]:
         return None
         
     except Exception as e:
-        logger.error(f"Failed to get video metadata: {str(e)}")
+        logger.error("Failed to get video metadata: %s", e)
         return None
 
 
@@ -243,10 +310,11 @@ def save_session(session_id: str, session_data: Dict) -> bool:
         }
         
         db.collection('sessions').document(session_id).set(doc, merge=True)
+        clear_query_cache()
         return True
         
     except Exception as e:
-        logger.error(f"Failed to save session: {str(e)}")
+        logger.error("Failed to save session: %s", e)
         return False
 
 
@@ -263,7 +331,7 @@ def get_session(session_id: str) -> Optional[Dict]:
         return None
         
     except Exception as e:
-        logger.error(f"Failed to get session: {str(e)}")
+        logger.error("Failed to get session: %s", e)
         return None
 
 
@@ -273,21 +341,100 @@ def get_recent_sessions(limit: int = 20) -> List[Dict]:
     if not db:
         return []
     
+    cache_key = ('recent_sessions', limit)
+    cached = get_cached_query(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
         docs = db.collection('sessions') \
             .order_by('updated_at', direction='DESCENDING') \
             .limit(limit) \
             .stream()
         
-        return [{'id': doc.id, **doc.to_dict()} for doc in docs]
+        results = [{'id': doc.id, **doc.to_dict()} for doc in docs]
+        set_cached_query(cache_key, results)
+        return results
         
     except Exception as e:
-        logger.error(f"Failed to get recent sessions: {str(e)}")
+        logger.error("Failed to get recent sessions: %s", e)
         return []
 
 
+# ===== BACKGROUND JOBS COLLECTION =====
+# Backup/restore status lives here rather than in process memory, so a status
+# poll can be answered by any worker or instance. Docs expire via a TTL policy
+# on expires_at (see firestore.indexes.json).
+JOB_RETENTION_DAYS = 7
+
+def save_job_status(task_id: str, status: Dict) -> bool:
+    """Create or update a background job's status doc."""
+    db = get_firestore()
+    if not db:
+        return False
+
+    try:
+        doc = {
+            **status,
+            'task_id': task_id,
+            'updated_at': datetime.now().isoformat(),
+            'expires_at': datetime.now(timezone.utc) + timedelta(days=JOB_RETENTION_DAYS)
+        }
+
+        db.collection('jobs').document(task_id).set(doc, merge=True)
+        return True
+
+    except Exception as e:
+        logger.error("Failed to save job status: %s", e)
+        return False
+
+
+def get_job_status(task_id: str) -> Optional[Dict]:
+    """Get a background job's status doc."""
+    db = get_firestore()
+    if not db:
+        return None
+
+    try:
+        doc = db.collection('jobs').document(task_id).get()
+        if doc.exists:
+            return doc.to_dict()
+        return None
+
+    except Exception as e:
+        logger.error("Failed to get job status: %s", e)
+        return None
+
+
 # ===== CHROMADB BACKUP TO GCS =====
 
+# Backups are moved in large parallel chunks rather than one small-buffered stream
+GCS_TRANSFER_CHUNK_SIZE = 32 * 1024 * 1024
+GCS_TRANSFER_MAX_WORKERS = 8
+GCS_HTTP_POOL_SIZE = 32  # > transfer workers, so chunk requests never wait on a connection
+
+_storage_client = None
+_storage_client_lock = threading.Lock()
+
+def get_storage_client():
+    """Get or create the shared Cloud Storage client (with an enlarged HTTP pool)."""
+    global _storage_client
+    if _storage_client is None:
+        with _storage_client_lock:
+            if _storage_client is None:
+                import google.auth
+                from google.auth.transport.requests import AuthorizedSession
+                from google.cloud import storage
+                from requests.adapters import HTTPAdapter
+                credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+                # The default urllib3 pool keeps 10 connections per host
+                session = AuthorizedSession(credentials)
+                adapter = HTTPAdapter(pool_connections=GCS_HTTP_POOL_SIZE, pool_maxsize=GCS_HTTP_POOL_SIZE)
+                session.mount('https://', adapter)
+                # _http is the client's documented hook for supplying a custom session
+                _storage_client = storage.Client(project=project, credentials=credentials, _http=session)
+    return _storage_client
+
 def backup_chromadb_to_gcs(local_path: str = './chroma_data', bucket_name: Optional[str] = None) -> bool:
     """
     Backup ChromaDB data to Google Cloud Storage.
@@ -300,12 +447,11 @@ def backup_chromadb_to_gcs(local_path: str = './chroma_data', bucket_name: Optio
         True if successful, False otherwise
     """
     try:
-        from google.cloud import storage
+        from google.cloud.storage import transfer_manager
         import shutil
         import tempfile
         
-        # Create storage client
-        client = storage.Client()
+        client = get_storage_client()
         
         # Use default bucket if not specified
         if not bucket_name:
@@ -317,7 +463,7 @@ def backup_chromadb_to_gcs(local_path: str = './chroma_data', bucket_name: Optio
             bucket = client.get_bucket(bucket_name)
         except Exception:
             bucket = client.create_bucket(bucket_name, location='us-central1')
-            logger.info(f"Created bucket: {bucket_name}")
+            logger.info("Created bucket: %s", bucket_name)
         
         # Create timestamped backup
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -334,17 +480,22 @@ def backup_chromadb_to_gcs(local_path: str = './chroma_data', bucket_name: Optio
             
             # Upload to GCS
             blob = bucket.blob(backup_name)
-            blob.upload_from_filename(tmp.name)
+            transfer_manager.upload_chunks_concurrently(
+                tmp.name,
+                blob,
+                chunk_size=GCS_TRANSFER_CHUNK_SIZE,
+                max_workers=GCS_TRANSFER_MAX_WORKERS,
+                worker_type=transfer_manager.THREAD
+            )
             
-            # Also update 'latest' pointer
-            latest_blob = bucket.blob('chromadb_latest.tar.gz')
-            latest_blob.upload_from_filename(tmp.name)
+            # Also update 'latest' pointer (server-side copy, no second upload)
+            bucket.copy_blob(blob, bucket, 'chromadb_latest.tar.gz')
         
-        logger.info(f"ChromaDB backed up to gs://{bucket_name}/{backup_name}")
+        logger.info("ChromaDB backed up to gs://%s/%s", bucket_name, backup_name)
         return True
         
     except Exception as e:
-        logger.error(f"Failed to backup ChromaDB: {str(e)}")
+        logger.error("Failed to backup ChromaDB: %s", e)
         return False
 
 
@@ -360,13 +511,12 @@ def restore_chromadb_from_gcs(local_path: str = './chroma_data', bucket_name: Op
         True if successful, False otherwise
     """
     try:
-        from google.cloud import storage
+        from google.cloud.storage import transfer_manager
         import shutil
         import tempfile
         import tarfile
         
-        # Create storage client
-        client = storage.Client()
+        client = get_storage_client()
         
         # Use default bucket if not specified
         if not bucket_name:
@@ -377,17 +527,23 @@ def restore_chromadb_from_gcs(local_path: str = './chroma_data', bucket_name: Op
         try:
             bucket = client.get_bucket(bucket_name)
         except Exception:
-            logger.warning(f"Bucket {bucket_name} not found, no backup to restore")
+            logger.warning("Bucket %s not found, no backup to restore", bucket_name)
             return False
         
-        # Download latest backup
-        blob = bucket.blob('chromadb_latest.tar.gz')
-        if not blob.exists():
+        # Download latest backup (get_blob also loads the size needed for ranged reads)
+        blob = bucket.get_blob('chromadb_latest.tar.gz')
+        if blob is None:
             logger.warning("No ChromaDB backup found")
             return False
         
         with tempfile.NamedTemporaryFile(suffix='.tar.gz', delete=False) as tmp:
-            blob.download_to_filename(tmp.name)
+            transfer_manager.download_chunks_concurrently(
+                blob,
+                tmp.name,
+                chunk_size=GCS_TRANSFER_CHUNK_SIZE,
+                max_workers=GCS_TRANSFER_MAX_WORKERS,
+                worker_type=transfer_manager.THREAD
+            )
             
             # Extract to local path
             with tarfile.open(tmp.name, 'r:gz') as tar:
@@ -398,18 +554,10 @@ def restore_chromadb_from_gcs(local_path: str = './chroma_data', bucket_name: Op
                 # Extract
                 tar.extractall(path=os.path.dirname(local_path))
         
-        logger.info(f"ChromaDB restored from gs://{bucket_name}/chromadb_latest.tar.gz")
+        logger.info("ChromaDB restored from gs://%s/chromadb_latest.tar.gz", bucket_name)
         return True
         
     except Exception as e:
-        logger.error(f"Failed to restore ChromaDB: {str(e)}")
+        logger.error("Failed to restore ChromaDB: %s", e)
         return False
 
-
-# ===== INITIALIZATION =====
-
-# Try to initialize on import
-try:
-    initialize_firestore()
-except Exception as e:
-    logger.warning(f"Firestore not available at startup: {str(e)}")
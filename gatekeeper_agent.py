@@ -21,12 +21,12 @@ class GatekeeperAgent:
         self.model_name = 'gemini-2.0-flash'
         if GOOGLE_API_KEY:
              try:
-                 from google import genai
-                 self.client = genai.Client(api_key=GOOGLE_API_KEY)
+                 from gemini_client import get_gemini_client
+                 self.client = get_gemini_client()
              except ImportError:
                  logger.error("Failed to import google.genai")
              except Exception as e:
-                 logger.error(f"Gatekeeper init error: {e}")
+                 logger.error("Gatekeeper init error: %s", e)
                  
         self.blocked_channels = set()
         # Initialize Graph
@@ -34,7 +34,7 @@ class GatekeeperAgent:
             from gatekeeper_graph import GatekeeperGraph
             self.graph = GatekeeperGraph()
         except Exception as e:
-            logger.error(f"Failed to init GatekeeperGraph: {e}")
+            logger.error("Failed to init GatekeeperGraph: %s", e)
             self.graph = None
             
         logger.info("Gatekeeper Agent initialized")
@@ -162,7 +162,7 @@ RETURN ONLY JSON.
             return final_results
 
         except Exception as e:
-            logger.error(f"Gatekeeper failed: {e}")
+            logger.error("Gatekeeper failed: %s", e)
             # Fail open (keep everything) on error so we don't break UI
             # But merge with already blocked ones
             fail_open_results = [{'id': v['id'], 'decision': 'keep', 'reason': 'Error'} for v in videos_to_process]
@@ -104,7 +104,7 @@ Return a JSON array of objects.
             return {"results": final_results}
             
         except Exception as e:
-            logger.error(f"Gatekeeper Graph failed: {e}")
+            logger.error("Gatekeeper Graph failed: %s", e)
             # Fail open
             for v in videos_to_process:
                 final_results.append({'id': v['id'], 'decision': 'keep', 'reason': 'Error'})
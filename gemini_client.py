@@ -0,0 +1,27 @@
+"""
+Shared Gemini client.
+Every agent and scorer calls the same API with the same key, so a single
+genai.Client (and its pooled keep-alive connections) serves them all instead
+of one client per agent, or per call in the scoring paths.
+"""
+
+import threading
+
+from config import Config
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_gemini_client():
+    """
+    Return the process-wide genai.Client, or None when GOOGLE_API_KEY is unset.
+    Created on first use, so gunicorn workers forked from a preloaded master
+    each open their own connections.
+    """
+    global _client
+    if _client is None and Config.GOOGLE_API_KEY:
+        with _client_lock:
+            if _client is None:
+                from google import genai
+                _client = genai.Client(api_key=Config.GOOGLE_API_KEY)
+    return _client
@@ -0,0 +1,50 @@
+"""
+Gunicorn configuration for the TubeFocus API (picked up automatically from
+the working directory: `gunicorn api:app`).
+"""
+
+import os
+
+# ===== Server Socket =====
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+# ===== Workers =====
+# Requests spend most of their time waiting on YouTube/Gemini/Firestore, so
+# each worker keeps several of them in flight on its own threads.
+# Set GUNICORN_WORKER_CLASS=gevent (requires `pip install gevent`) to serve
+# them from greenlets instead.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+# Each worker builds its own agents and caches, and cpu_count() reports the
+# host's CPUs on Cloud Run, so the count is fixed rather than derived from it.
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '1000'))  # gevent only
+
+# Allow up to 120s for slow AI/embedding API calls (default 30s causes WORKER TIMEOUT)
+timeout = 120
+# Reuse client connections between requests instead of reconnecting each time
+keepalive = 30
+
+# Import api.py once in the master; workers are forked from it and share
+# the already-loaded modules copy-on-write. gevent has to monkey-patch the
+# socket/ssl modules before requests, redis or grpc are imported, so it loads
+# the app in each worker instead.
+preload_app = worker_class != 'gevent'
+
+
+def post_worker_init(worker):
+    if worker_class == 'gevent':
+        # Let Firestore's grpc channels yield to other greenlets. Runs here
+        # because the gevent worker only monkey-patches in init_process(),
+        # after post_fork.
+        import grpc.experimental.gevent as grpc_gevent
+        grpc_gevent.init_gevent()
+    # Build the librarian (Firestore + Gemini clients) before the worker takes
+    # traffic, so the first search doesn't pay for it. grpc channels are not
+    # fork-safe, hence here rather than in the preloaded master.
+    # (Each worker's log listener is restarted by api.py's fork hooks.)
+    import api
+    try:
+        api._librarian_agent()
+    except Exception as e:
+        worker.log.warning("Librarian warm-up failed: %s", e)
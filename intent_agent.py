@@ -1,6 +1,8 @@
 import logging
 import json
 import re
+import threading
+import time
 from config import Config
 from intent_graph import IntentGraph
 
@@ -8,6 +10,9 @@ from intent_graph import IntentGraph
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+INTENT_CACHE_TTL = 3600  # seconds
+INTENT_CACHE_MAX_SIZE = 4096
+
 class IntentAgent:
     """
     Classifies user goals into specific learning archetypes (Intents)
@@ -29,15 +34,18 @@ class IntentAgent:
 
     def __init__(self):
         self.client = None
+        # goal (normalized) -> (intent_result, timestamp); shared by /score and /gatekeeper/filter
+        self._cache = {}
+        self._cache_lock = threading.Lock()
         if Config.GOOGLE_API_KEY:
             try:
-                from google import genai
-                self.client = genai.Client(api_key=Config.GOOGLE_API_KEY)
+                from gemini_client import get_gemini_client
+                self.client = get_gemini_client()
                 self.graph = IntentGraph(self.INTENT_TAXONOMY)
             except ImportError:
                 logger.error("Failed to import google.genai")
             except Exception as e:
-                logger.error(f"IntentAgent init error: {e}")
+                logger.error("IntentAgent init error: %s", e)
         else:
             logger.warning("IntentAgent initialized without GOOGLE_API_KEY")
 
@@ -53,7 +61,7 @@ class IntentAgent:
             # Fuzzy match or direct lookup could go here, but let's try direct first
             for key in self.INTENT_TAXONOMY:
                 if key.lower() == potential_intent.lower():
-                    logger.info(f"Explicit intent detected: {key}")
+                    logger.info("Explicit intent detected: %s", key)
                     return {
                         "intent": key,
                         "confidence": 1.0,
@@ -65,12 +73,40 @@ class IntentAgent:
         if not self.client:
             return self._get_default_intent()
 
+        cache_key = goal.strip().lower()
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            return self.graph.invoke(goal)
+            result = self.graph.invoke(goal)
         except Exception as e:
-            logger.error(f"Intent inference failed: {e}")
+            logger.error("Intent inference failed: %s", e)
             return self._get_default_intent()
 
+        # Only cache real classifications; fallbacks should be retried next time
+        if result.get("source") == "langgraph_inferred":
+            self._set_cached(cache_key, result)
+        return result
+
+    def _get_cached(self, key: str):
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            result, ts = entry
+            if time.time() - ts > INTENT_CACHE_TTL:
+                del self._cache[key]
+                return None
+            return result
+
+    def _set_cached(self, key: str, result: dict):
+        with self._cache_lock:
+            if len(self._cache) >= INTENT_CACHE_MAX_SIZE:
+                # Evict the oldest insertion
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = (result, time.time())
+
     def _get_default_intent(self):
         return {
             "intent": "Skill Acquisition",
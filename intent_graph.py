@@ -53,7 +53,7 @@ class IntentGraph:
                  }
              }
         except Exception as e:
-            logger.error(f"Intent Graph failed: {e}")
+            logger.error("Intent Graph failed: %s", e)
             return {
                 "intent_result": {
                     "intent": "Skill Acquisition", 
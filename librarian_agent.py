@@ -2,14 +2,21 @@ import logging
 import os
 import time
 import hashlib
+import heapq
 import re
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
-from google import genai
+from google.api_core import exceptions as gcp_exceptions
 from google.cloud import firestore
 from google.cloud.firestore_v1.vector import Vector
 from google.cloud.firestore_v1.base_vector_query import DistanceMeasure
 from config import Config
+import firestore_service as fs
+from gemini_client import get_gemini_client
 from librarian_graph import LibrarianGraph
 
 # Setup logging
@@ -19,24 +26,124 @@ logger = logging.getLogger(__name__)
 # Librarian Agent uses the provided API key or environment variable
 # Initialization happens in __init__
 
+# Fields returned by the library listings. Projecting them in the query keeps
+# embeddings and transcript text off the wire (and out of the JSON response).
+SAVED_VIDEO_FIELDS = [
+    "original_video_id", "video_id", "video_url", "title", "goal", "score",
+    "indexed_at", "save_mode", "description",
+]
+LEGACY_SAVED_VIDEO_FIELDS = SAVED_VIDEO_FIELDS + ["manual_save", "type"]
+SUMMARY_FIELDS = [
+    "video_id", "original_video_id", "title", "goal", "score", "chunk_index",
+    "total_chunks", "indexed_at", "text", "summary", "summary_preset",
+    "video_url", "type", "embedding_missing",
+]
+
+# Fields read by _format_search_result and the lexical scorer; the
+# non-vector search queries project to these so chunk embeddings stay in Firestore.
+SEARCH_RESULT_FIELDS = [
+    "original_video_id", "video_id", "video_url", "title", "goal", "score",
+    "text", "tier", "start_time", "end_time", "parent_doc_id", "chunk_index",
+    "type", "description", "summary",
+]
+
+# Texts per embed_content request (API maximum for batched embeddings)
+EMBED_BATCH_SIZE = 100
+# Layer 2 cache bound; 768-dim float32 vectors are ~3 KB each
+EMBEDDING_CACHE_MAX_SIZE = 20000
+# How long a caller waits on a concurrent identical embedding before computing its own
+EMBED_INFLIGHT_WAIT = 30  # seconds
+
+# Runs the Tier 1 summary (generate + embed) while index_video embeds the chunks
+_index_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='librarian-index')
+
 # ── Caching Layers ─────────────────────────────────────────────────────
 class EmbeddingCache:
-    """Layer 2: In-memory cache for embedding vectors to avoid redundant API calls."""
-    def __init__(self):
-        self._cache = {}  # {md5_hash: embedding_vector}
+    """
+    Layer 2: In-memory cache for embedding vectors to avoid redundant API calls.
+    Keyed by a hash of the text, so repeat searches for the same query reuse
+    its vector whatever their other parameters. Vectors are kept as packed
+    float32 arrays (4 bytes per dimension instead of a ~32-byte Python float
+    object each) and the least recently used entries are evicted past max_size.
+    """
+    def __init__(self, max_size=EMBEDDING_CACHE_MAX_SIZE):
+        self._cache = OrderedDict()  # {md5_hash: array('f')}, least recently used first
+        self._max_size = max_size
         self._hits = 0
         self._misses = 0
+        self._in_flight = {}  # {md5_hash: threading.Event} for single-text computes
+        self._in_flight_lock = threading.Lock()
+
+    def _key(self, text, task_type):
+        return hashlib.md5(f"{task_type}:{text.lower().strip()}".encode()).hexdigest()
+
+    def _lookup(self, key):
+        vector = self._cache.get(key)
+        if vector is not None:
+            try:
+                self._cache.move_to_end(key)
+            except KeyError:
+                pass  # evicted by another thread in between
+        return vector
+
+    def _store(self, key, values):
+        vector = array('f', values)
+        self._cache[key] = vector
+        while len(self._cache) > self._max_size:
+            try:
+                self._cache.popitem(last=False)
+            except KeyError:
+                break
+        return vector
 
     def get_or_compute(self, text, compute_fn, task_type='RETRIEVAL_DOCUMENT'):
-        key = hashlib.md5(f"{task_type}:{text.lower().strip()}".encode()).hexdigest()
-        if key in self._cache:
+        """
+        Concurrent misses for the same text share one compute_fn call: the
+        first caller computes, the rest wait for its result.
+        """
+        key = self._key(text, task_type)
+        cached = self._lookup(key)
+        if cached is not None:
             self._hits += 1
-            return self._cache[key]
+            return cached
+
+        with self._in_flight_lock:
+            event = self._in_flight.get(key)
+            owner = event is None
+            if owner:
+                event = self._in_flight[key] = threading.Event()
+        if not owner:
+            event.wait(EMBED_INFLIGHT_WAIT)
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._hits += 1
+                return cached
+            # The other caller failed or timed out; compute independently
+
         self._misses += 1
-        result = compute_fn(text, task_type)
-        if result is not None:
-            self._cache[key] = result
-        return result
+        try:
+            result = compute_fn(text, task_type)
+            if result is not None:
+                result = self._store(key, result)
+            return result
+        finally:
+            if owner:
+                with self._in_flight_lock:
+                    self._in_flight.pop(key, None)
+                event.set()
+
+    def get_or_compute_many(self, texts, compute_many_fn, task_type='RETRIEVAL_DOCUMENT'):
+        """Like get_or_compute, but all misses are computed in one compute_many_fn call."""
+        keys = [self._key(text, task_type) for text in texts]
+        results = [self._lookup(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        self._hits += len(texts) - len(missing)
+        self._misses += len(missing)
+        if missing:
+            computed = compute_many_fn([texts[i] for i in missing], task_type)
+            for i, result in zip(missing, computed):
+                results[i] = self._store(keys[i], result) if result is not None else None
+        return results
 
     @property
     def stats(self):
@@ -63,6 +170,9 @@ class SourceCardCache:
     def invalidate(self, video_id):
         self._cache.pop(video_id, None)
 
+    def clear(self):
+        self._cache.clear()
+
 
 class LibrarianAgent:
     """
@@ -76,11 +186,11 @@ class LibrarianAgent:
             # Initialize Firestore Client
             self.db = firestore.Client()
             self.collection_name = "video_chunks"
+            # Cleared if the (goal, embedding) vector index turns out to be missing
+            self._goal_prefilter_enabled = True
             
             # Initialize GenAI Client
-            self.client = None
-            if Config.GOOGLE_API_KEY:
-                self.client = genai.Client(api_key=Config.GOOGLE_API_KEY)
+            self.client = get_gemini_client()
             
             # Initialize Caches
             self._embedding_cache = EmbeddingCache()
@@ -89,17 +199,55 @@ class LibrarianAgent:
             logger.info("Librarian Agent initialized with Firestore + caching")
             
         except Exception as e:
-            logger.error(f"Failed to initialize Firestore Librarian: {str(e)}")
+            logger.error("Failed to initialize Firestore Librarian: %s", e)
             self.db = None
             self.client = None
             self._embedding_cache = EmbeddingCache()
             self._source_card_cache = SourceCardCache()
+
+    def reload(self):
+        """
+        Drop cached Firestore reads after the backing data was restored.
+        The Firestore/GenAI clients and the embedding cache (keyed by text) are kept.
+        """
+        self._source_card_cache.clear()
+        fs.clear_query_cache()
+        logger.info("Librarian caches cleared after restore")
+
+    def _invalidate_video(self, video_id):
+        """Drop cached reads affected by a write for video_id."""
+        self._source_card_cache.invalidate(video_id)
+        fs.clear_query_cache()
             
     def _get_embedding(self, text, task_type='RETRIEVAL_DOCUMENT'):
         """Generate embedding using Gemini, with caching (Layer 2)."""
         if not self.client: return None
         return self._embedding_cache.get_or_compute(text, self._compute_embedding, task_type)
 
+    def _get_embeddings(self, texts, task_type='RETRIEVAL_DOCUMENT'):
+        """Embed several texts with batched API calls, with caching (Layer 2)."""
+        if not self.client: return [None] * len(texts)
+        return self._embedding_cache.get_or_compute_many(texts, self._compute_embeddings, task_type)
+
+    def _compute_embeddings(self, texts, task_type='RETRIEVAL_DOCUMENT'):
+        """Raw batched embedding API calls (uncached); None for any text that failed."""
+        embeddings = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            batch = texts[start:start + EMBED_BATCH_SIZE]
+            try:
+                result = self.client.models.embed_content(
+                    model="models/text-embedding-004",
+                    contents=batch,
+                    config={'task_type': task_type}
+                )
+                if len(result.embeddings) != len(batch):
+                    raise ValueError(f"expected {len(batch)} embeddings, got {len(result.embeddings)}")
+                embeddings.extend(e.values for e in result.embeddings)
+            except Exception as e:
+                logger.error("Batch embedding generation failed (%s texts): %s", len(batch), e)
+                embeddings.extend([None] * len(batch))
+        return embeddings
+
     def _compute_embedding(self, text, task_type='RETRIEVAL_DOCUMENT'):
         """Raw embedding API call (uncached)."""
         try:
@@ -111,7 +259,7 @@ class LibrarianAgent:
             )
             return result.embeddings[0].values
         except Exception as e:
-            logger.error(f"Embedding generation failed: {e}", exc_info=True)
+            logger.error("Embedding generation failed: %s", e)
             return None
 
     def _normalize_original_video_id(self, raw_video_id: Optional[str]) -> str:
@@ -174,7 +322,7 @@ class LibrarianAgent:
         # Check source card cache (Layer 3)
         cached = self._source_card_cache.get(normalized_id)
         if cached:
-            logger.info(f"Source card cache hit for {normalized_id}")
+            logger.info("Source card cache hit for %s", normalized_id)
             return cached
 
         saved_video_doc = None
@@ -209,7 +357,7 @@ class LibrarianAgent:
                 if text and len(snippets) < 12:
                     snippets.append(text[:500])
         except Exception as e:
-            logger.warning(f"Context card query failed for {normalized_id}: {e}")
+            logger.warning("Context card query failed for %s: %s", normalized_id, e)
 
         title = (
             (saved_video_doc or {}).get("title")
@@ -254,7 +402,7 @@ class LibrarianAgent:
             highlights.sort(key=lambda h: (h.get("timestamp") if h.get("timestamp") is not None else 10**9))
             highlights = highlights[:8]
         except Exception as e:
-            logger.warning(f"Highlight enrichment failed for {normalized_id}: {e}")
+            logger.warning("Highlight enrichment failed for %s: %s", normalized_id, e)
 
         if not summary and snippets:
             summary = snippets[0]
@@ -301,7 +449,7 @@ class LibrarianAgent:
 
         return cards
 
-    def index_video(self, video_id, title, transcript, goal, score, metadata=None, segments=None):
+    def index_video(self, video_id, title, transcript, goal, score, metadata=None, segments=None, extra_docs=None):
         """
         Index a video transcript into Firestore using 3-tier hierarchical chunking.
         
@@ -311,34 +459,41 @@ class LibrarianAgent:
         
         If segments (timestamped) are available, uses temporal chunking.
         Falls back to character-based chunking if only flat transcript is available.
+        extra_docs: optional (doc_ref, data) pairs committed in the same final write batch.
         """
         if not self.db or not self.client: return False
 
         try:
             if not transcript or len(transcript.strip()) == 0:
-                logger.warning(f"Skipping indexing for {video_id}: No transcript")
+                logger.warning("Skipping indexing for %s: No transcript", video_id)
                 return False
             
             # Decide chunking strategy based on available data
             if segments and len(segments) > 0:
                 tier2_chunks, tier3_chunks = self._chunk_transcript_hierarchical(segments)
                 all_chunks = tier2_chunks + tier3_chunks
-                logger.info(f"Hierarchical chunking: {len(tier2_chunks)} Tier-2 + {len(tier3_chunks)} Tier-3 chunks")
+                logger.info("Hierarchical chunking: %s Tier-2 + %s Tier-3 chunks", len(tier2_chunks), len(tier3_chunks))
             else:
                 # Fallback: character-based chunking (backwards compatible)
                 raw_chunks = self._chunk_transcript_flat(transcript, chunk_size=500)
                 all_chunks = [{
                     'text': c, 'tier': 2, 'start_time': None, 'end_time': None
                 } for c in raw_chunks]
-                logger.info(f"Flat chunking fallback: {len(all_chunks)} chunks")
+                logger.info("Flat chunking fallback: %s chunks", len(all_chunks))
 
             if not all_chunks: return False
+
+            # ── Tier 1: summary is generated in the background, written with the last chunk batch ──
+            tier1_future = _index_executor.submit(
+                self._build_tier1_summary, video_id, title, transcript, goal, score, metadata
+            )
             
             batch = self.db.batch()
             count = 0
+            # One embed request per EMBED_BATCH_SIZE chunks instead of one per chunk
+            embeddings = self._get_embeddings([chunk['text'] for chunk in all_chunks])
             
-            for i, chunk in enumerate(all_chunks):
-                embedding = self._get_embedding(chunk['text'])
+            for i, (chunk, embedding) in enumerate(zip(all_chunks, embeddings)):
                 if not embedding:
                     continue
                 
@@ -378,26 +533,31 @@ class LibrarianAgent:
                     batch = self.db.batch()
                     count = 0
             
+            tier1_doc = tier1_future.result()
+            for doc_ref, data in ([tier1_doc] if tier1_doc else []) + list(extra_docs or []):
+                batch.set(doc_ref, data)
+                count += 1
+            
             if count > 0:
                 batch.commit()
-            
-            # ── Tier 1: Generate and store a video summary ──
-            self._index_tier1_summary(video_id, title, transcript, goal, score, metadata)
                 
-            logger.info(f"Indexed video {video_id}: {len(all_chunks)} hierarchical chunks to Firestore")
+            logger.info("Indexed video %s: %s hierarchical chunks to Firestore", video_id, len(all_chunks))
             
             # Invalidate source card cache for this video
             original_id = self._normalize_original_video_id(video_id)
-            self._source_card_cache.invalidate(original_id)
+            self._invalidate_video(original_id)
             
             return True
             
         except Exception as e:
-            logger.error(f"Failed to index video {video_id}: {str(e)}")
+            logger.error("Failed to index video %s: %s", video_id, e)
             return False
 
-    def _index_tier1_summary(self, video_id, title, transcript, goal, score, metadata=None):
-        """Generate and index a Tier 1 LLM summary for broad 'which video?' retrieval."""
+    def _build_tier1_summary(self, video_id, title, transcript, goal, score, metadata=None):
+        """
+        Generate a Tier 1 LLM summary for broad 'which video?' retrieval.
+        Returns (doc_ref, data) for the caller's write batch, or None on failure.
+        """
         try:
             # Use a short excerpt for summary generation (first 3000 chars)
             excerpt = transcript[:3000]
@@ -414,7 +574,7 @@ class LibrarianAgent:
             embed_text = f"{title}. {summary_text}"
             embedding = self._get_embedding(embed_text)
             if not embedding:
-                return
+                return None
             
             doc_ref = self.db.collection(self.collection_name).document(f"{video_id}_t1_summary")
             chunk_data = {
@@ -437,10 +597,10 @@ class LibrarianAgent:
                 chunk_meta = metadata.copy()
                 chunk_meta.pop("type", None)
                 chunk_data.update(chunk_meta)
-            doc_ref.set(chunk_data)
-            logger.info(f"Tier 1 summary indexed for {video_id}")
+            return doc_ref, chunk_data
         except Exception as e:
-            logger.warning(f"Tier 1 summary generation failed for {video_id}: {e}")
+            logger.warning("Tier 1 summary generation failed for %s: %s", video_id, e)
+            return None
 
     def save_video_item(self, video_id, title, user_goal, score=100, video_url="", transcript="", description="", segments=None):
         """
@@ -467,6 +627,17 @@ class LibrarianAgent:
                     "original_video_id": video_id
                 }
                 if client_available:
+                    # Metadata-only chunk so title/description queries can match;
+                    # committed in the same batch as the transcript chunks.
+                    meta_doc = self._build_metadata_chunk(
+                        storage_video_id,
+                        title=title,
+                        description=description,
+                        goal=user_goal,
+                        score=score,
+                        video_url=video_url,
+                        original_video_id=video_id
+                    )
                     success = self.index_video(
                         video_id=storage_video_id,
                         title=title,
@@ -474,21 +645,12 @@ class LibrarianAgent:
                         goal=user_goal,
                         score=score,
                         metadata=metadata,
-                        segments=segments  # Pass segments for hierarchical chunking
+                        segments=segments,  # Pass segments for hierarchical chunking
+                        extra_docs=[meta_doc] if meta_doc else None
                     )
                     if success:
-                        # Add a metadata-only chunk so title/description queries can match.
-                        self._index_metadata_chunk(
-                            storage_video_id,
-                            title=title,
-                            description=description,
-                            goal=user_goal,
-                            score=score,
-                            video_url=video_url,
-                            original_video_id=video_id
-                        )
                         return {"success": True, "save_mode": "transcript"}
-                    logger.warning(f"Transcript indexing failed for {video_id}; storing metadata-only fallback.")
+                    logger.warning("Transcript indexing failed for %s; storing metadata-only fallback.", video_id)
 
                 # Fallback persistence without embeddings so saved list still works.
                 fallback_ref = self.db.collection(self.collection_name).document(f"saved_meta_{video_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}")
@@ -509,7 +671,7 @@ class LibrarianAgent:
                     "video_url": video_url,
                     "embedding_missing": True
                 })
-                self._source_card_cache.invalidate(video_id)
+                self._invalidate_video(video_id)
                 return {"success": True, "save_mode": "transcript"}
 
             if not description:
@@ -553,11 +715,11 @@ class LibrarianAgent:
                 doc_data["embedding_missing"] = True
 
             doc_ref.set(doc_data)
-            self._source_card_cache.invalidate(video_id)
+            self._invalidate_video(video_id)
             return {"success": True, "save_mode": "link_only"}
 
         except Exception as e:
-            logger.error(f"Failed to save video item {video_id}: {e}")
+            logger.error("Failed to save video item %s: %s", video_id, e)
             return {"success": False, "error": str(e), "save_mode": None}
 
     def save_video_summary(self, video_id, title, user_goal, summary, preset="youtube_ask", video_url=""):
@@ -595,28 +757,33 @@ class LibrarianAgent:
                 doc_data["embedding_missing"] = True
 
             doc_ref.set(doc_data)
-            self._source_card_cache.invalidate(video_id)
+            self._invalidate_video(video_id)
             return {"success": True}
         except Exception as e:
-            logger.error(f"Failed to save summary for {video_id}: {e}")
+            logger.error("Failed to save summary for %s: %s", video_id, e)
             return {"success": False, "error": str(e)}
 
     def get_saved_videos(self, limit=50):
         """Retrieve saved videos with deduped entries for UI listing."""
         if not self.db: return []
+        cached = fs.get_cached_query(('saved_videos', limit))
+        if cached is not None:
+            return cached
         
         try:
             try:
                 docs = self.db.collection(self.collection_name)\
                     .where(filter=firestore.FieldFilter("type", "==", "saved_video"))\
+                    .select(SAVED_VIDEO_FIELDS)\
                     .order_by("indexed_at", direction=firestore.Query.DESCENDING)\
                     .limit(max(limit * 8, 100))\
                     .stream()
                 doc_list = list(docs)
             except Exception as inner_e:
-                logger.warning(f"Fallback to memory sort due to index issue: {inner_e}")
+                logger.warning("Fallback to memory sort due to index issue: %s", inner_e)
                 docs = self.db.collection(self.collection_name)\
                     .where(filter=firestore.FieldFilter("type", "==", "saved_video"))\
+                    .select(SAVED_VIDEO_FIELDS)\
                     .limit(max(limit * 8, 400))\
                     .stream()
                 doc_list = list(docs)
@@ -661,6 +828,7 @@ class LibrarianAgent:
             # Legacy fallback: older entries may not have type=saved_video.
             if not by_video:
                 legacy_docs = self.db.collection(self.collection_name) \
+                    .select(LEGACY_SAVED_VIDEO_FIELDS) \
                     .order_by("indexed_at", direction=firestore.Query.DESCENDING) \
                     .limit(max(limit * 20, 250)) \
                     .stream()
@@ -711,9 +879,11 @@ class LibrarianAgent:
                 for item in recovered:
                     by_video[item["video_id"]] = item
 
-            return list(by_video.values())
+            videos = list(by_video.values())
+            fs.set_cached_query(('saved_videos', limit), videos)
+            return videos
         except Exception as e:
-            logger.error(f"Failed to get saved videos: {e}")
+            logger.error("Failed to get saved videos: %s", e)
             return []
 
     def _recover_saved_videos_from_highlights(self, limit=50):
@@ -757,16 +927,16 @@ class LibrarianAgent:
 
             return list(by_video.values())
         except Exception as e:
-            logger.error(f"Failed to recover saved videos from highlights: {e}")
+            logger.error("Failed to recover saved videos from highlights: %s", e)
             return []
 
-    def _index_metadata_chunk(self, storage_video_id: str, title: str, description: str, goal: str, score: float, video_url: str, original_video_id: str):
-        """Index a metadata-only chunk so title/description queries can match."""
+    def _build_metadata_chunk(self, storage_video_id: str, title: str, description: str, goal: str, score: float, video_url: str, original_video_id: str):
+        """Build a metadata-only chunk (doc_ref, data) so title/description queries can match."""
         if not self.db:
-            return
+            return None
         meta_text = " ".join([t for t in [title, description, f"Goal: {goal}"] if t]).strip()
         if not meta_text:
-            return
+            return None
         doc_id = f"{storage_video_id}_meta"
         doc_ref = self.db.collection(self.collection_name).document(doc_id)
         doc_data = {
@@ -792,71 +962,46 @@ class LibrarianAgent:
                 doc_data["embedding_missing"] = True
         else:
             doc_data["embedding_missing"] = True
-        try:
-            doc_ref.set(doc_data)
-            self._source_card_cache.invalidate(original_video_id)
-        except Exception as e:
-            logger.warning(f"Metadata chunk indexing failed for {storage_video_id}: {e}")
+        return doc_ref, doc_data
 
     def get_saved_summaries(self, limit=50):
         """Retrieve generated video summaries."""
         if not self.db: return []
+        cached = fs.get_cached_query(('summaries', limit))
+        if cached is not None:
+            return cached
 
         try:
             try:
                 docs = self.db.collection(self.collection_name)\
                     .where(filter=firestore.FieldFilter("type", "==", "video_summary"))\
+                    .select(SUMMARY_FIELDS)\
                     .order_by("indexed_at", direction=firestore.Query.DESCENDING)\
                     .limit(limit)\
                     .stream()
                 doc_list = list(docs)
             except Exception as inner_e:
-                logger.warning(f"Fallback to memory sort for summaries: {inner_e}")
+                logger.warning("Fallback to memory sort for summaries: %s", inner_e)
                 docs = self.db.collection(self.collection_name)\
                     .where(filter=firestore.FieldFilter("type", "==", "video_summary"))\
+                    .select(SUMMARY_FIELDS)\
                     .limit(limit * 4)\
                     .stream()
                 doc_list = list(docs)
                 doc_list.sort(key=lambda d: ((d.to_dict() or {}).get("indexed_at") or ""), reverse=True)
                 doc_list = doc_list[:limit]
 
-            return [doc.to_dict() for doc in doc_list]
+            summaries = [doc.to_dict() for doc in doc_list]
+            fs.set_cached_query(('summaries', limit), summaries)
+            return summaries
         except Exception as e:
-            logger.error(f"Failed to get saved summaries: {e}")
+            logger.error("Failed to get saved summaries: %s", e)
             return []
 
     def get_all_highlights(self, limit=50):
-        """Retrieve recent highlights across all videos."""
-        if not self.db: return []
-        
-        try:
-            # Assuming highlights are stored in a separate collection or mixed in 'video_content'
-            # If they are in 'video_content', they should have type='highlight' (if we designed it that way)
-            # Or if they are in a separate collection 'highlights'. 
-            # Looking at api.py, it imports 'get_highlights_for_video' from 'firestore_service'.
-            # Let's check firestore_service.py to be sure where highlights live.
-            # Assuming for now we can query the 'highlights' collection if it exists
-            # OR we effectively query key insights.
-            
-            # Use the 'highlights' collection if it exists, otherwise return empty
-            docs = self.db.collection('highlights')\
-                .order_by("created_at", direction=firestore.Query.DESCENDING)\
-                .limit(limit)\
-                .stream()
-
-            highlights = []
-            for doc in docs:
-                data = doc.to_dict() or {}
-                data["id"] = doc.id
-                if not data.get("range_label"):
-                    start = data.get("timestamp_formatted") or str(data.get("timestamp", ""))
-                    end = data.get("end_timestamp_formatted") or str(data.get("end_timestamp", data.get("timestamp", "")))
-                    data["range_label"] = f"{start} - {end}" if start and end else start
-                highlights.append(data)
-            return highlights
-        except Exception as e:
-            logger.error(f"Failed to get all highlights: {e}")
-            return []
+        """Retrieve recent highlights across all videos (shared query in firestore_service)."""
+        from firestore_service import get_highlights
+        return get_highlights(limit=limit)
 
     def _is_highlight_inventory_query(self, query: str) -> bool:
         text = (query or "").lower()
@@ -1141,13 +1286,14 @@ class LibrarianAgent:
             
             if focus_video_id:
                 # ── FOCUSED MODE: Directly fetch chunks for this video from Firestore ──
-                logger.info(f"Focused retrieval on video: {focus_video_id}")
+                logger.info("Focused retrieval on video: %s", focus_video_id)
                 focus_norm = self._normalize_original_video_id(focus_video_id)
 
                 # Strategy A: Direct Firestore query for this video's chunks (guaranteed to find them)
                 try:
                     direct_docs = collection_ref \
                         .where(filter=firestore.FieldFilter("original_video_id", "==", focus_norm)) \
+                        .select(SEARCH_RESULT_FIELDS) \
                         .limit(50) \
                         .stream()
                     for doc in direct_docs:
@@ -1156,7 +1302,7 @@ class LibrarianAgent:
                         if text:
                             formatted_results.append(self._format_search_result(data))
                 except Exception as e:
-                    logger.warning(f"Direct focused query failed: {e}")
+                    logger.warning("Direct focused query failed: %s", e)
 
                 # Also try with "saved_" prefixed video_id for older entries
                 if not formatted_results:
@@ -1164,6 +1310,7 @@ class LibrarianAgent:
                         saved_id = f"saved_{focus_norm}"
                         alt_docs = collection_ref \
                             .where(filter=firestore.FieldFilter("video_id", "==", saved_id)) \
+                            .select(SEARCH_RESULT_FIELDS) \
                             .limit(40) \
                             .stream()
                         for doc in alt_docs:
@@ -1172,7 +1319,7 @@ class LibrarianAgent:
                             if text:
                                 formatted_results.append(self._format_search_result(data))
                     except Exception as e:
-                        logger.warning(f"Alt focused query failed: {e}")
+                        logger.warning("Alt focused query failed: %s", e)
 
                 # Strategy B: Also do vector search and filter for this video (catches semantic relevance)
                 try:
@@ -1190,16 +1337,17 @@ class LibrarianAgent:
                                 seen_snippets_focused.add(result.get('snippet', '')[:80])
                                 formatted_results.append(result)
                 except Exception as e:
-                    logger.warning(f"Vector focused search supplement failed: {e}")
+                    logger.warning("Vector focused search supplement failed: %s", e)
             else:
                 # ── Phase 1: Broad retrieval (Tier 1 + 2) ──
                 phase1_results = self._vector_search(
-                    collection_ref, query_embedding, limit=10
+                    collection_ref, query_embedding, limit=10, goal_filter=goal_filter
                 )
                 
                 # Identify top matched video IDs
                 matched_video_ids = []
                 for data in phase1_results:
+                    # Still needed when the pre-filter fell back to an unfiltered search
                     if goal_filter and data.get('goal') != goal_filter:
                         continue
                     vid = self._normalize_original_video_id(
@@ -1210,10 +1358,10 @@ class LibrarianAgent:
                     formatted_results.append(self._format_search_result(data))
                 
                 # ── Phase 2: Drill-down into Tier 3 for top 3 matched videos ──
+                # The drill-down is the same nearest-neighbour query with a
+                # smaller limit, so its hits are the head of Phase 1's results.
+                tier3_results = phase1_results[:4]
                 for vid in matched_video_ids[:3]:
-                    tier3_results = self._vector_search(
-                        collection_ref, query_embedding, limit=4
-                    )
                     for data in tier3_results:
                         result_vid = self._normalize_original_video_id(
                             data.get('original_video_id', data.get('video_id'))
@@ -1265,13 +1413,26 @@ class LibrarianAgent:
                 fallback = self._lexical_search_history(query, n_results=n_results, focus_video_id=focus_video_id)
                 return fallback
 
-            logger.info(f"Multi-tier search for '{query}' returned {len(formatted_results)} results")
+            logger.info("Multi-tier search for '%s' returned %s results", query, len(formatted_results))
             return {'query': query, 'results': formatted_results}
             
         except Exception as e:
-            logger.error(f"Search failed: {str(e)}")
+            logger.error("Search failed: %s", e)
             return self._lexical_search_history(query, n_results=n_results, focus_video_id=focus_video_id)
 
+    def search_history_many(self, queries, n_results=5, goal_filter=None):
+        """
+        search_history for several queries, in input order. All query
+        embeddings are computed in one batched call up front, so each search
+        reads its embedding from the cache (Layer 2).
+        """
+        if self.db and self.client:
+            self._get_embeddings(queries, task_type='RETRIEVAL_QUERY')
+        return [
+            self.search_history(query, n_results=n_results, goal_filter=goal_filter)
+            for query in queries
+        ]
+
     def _lexical_search_history(self, query, n_results=5, focus_video_id=None):
         """
         Fallback retrieval when embeddings are unavailable or vector search fails.
@@ -1284,6 +1445,7 @@ class LibrarianAgent:
 
         try:
             docs = self.db.collection(self.collection_name) \
+                .select(SEARCH_RESULT_FIELDS) \
                 .order_by("indexed_at", direction=firestore.Query.DESCENDING) \
                 .limit(250) \
                 .stream()
@@ -1306,22 +1468,49 @@ class LibrarianAgent:
                     continue
                 scored.append((score, data))
 
-            scored.sort(key=lambda pair: pair[0], reverse=True)
-            results = [self._format_search_result(data) for _, data in scored[: max(1, n_results)]]
+            # Partial selection of the top n (same order as a stable full sort)
+            top = heapq.nlargest(max(1, n_results), scored, key=lambda pair: pair[0])
+            results = [self._format_search_result(data) for _, data in top]
             return {'query': query, 'results': results, 'fallback': 'lexical'}
         except Exception as e:
-            logger.error(f"Lexical search fallback failed: {e}")
+            logger.error("Lexical search fallback failed: %s", e)
             return {'query': query, 'results': [], 'error': str(e)}
 
-    def _vector_search(self, collection_ref, query_embedding, limit=10):
-        """Execute a Firestore vector search and return raw doc dicts."""
-        vector_query = collection_ref.find_nearest(
-            vector_field="embedding",
-            query_vector=Vector(query_embedding),
-            distance_measure=DistanceMeasure.COSINE,
-            limit=limit
-        )
-        return [doc.to_dict() for doc in vector_query.get()]
+    def _vector_search(self, collection_ref, query_embedding, limit=10, goal_filter=None):
+        """
+        Execute a Firestore vector search and return raw doc dicts.
+
+        With goal_filter, the nearest-neighbour scan is restricted to that
+        goal's documents (pre-filter) so the top-k is never under-filled by
+        post-filtering. This needs the composite vector index on
+        (goal, embedding) from firestore.indexes.json; if Firestore reports
+        it missing, the pre-filter is switched off for this process and the
+        unfiltered search is used.
+        """
+        if not self._goal_prefilter_enabled:
+            goal_filter = None
+        base_query = collection_ref
+        if goal_filter:
+            base_query = collection_ref.where(filter=firestore.FieldFilter("goal", "==", goal_filter))
+        try:
+            vector_query = base_query.find_nearest(
+                vector_field="embedding",
+                query_vector=Vector(query_embedding),
+                distance_measure=DistanceMeasure.COSINE,
+                limit=limit
+            )
+            return [doc.to_dict() for doc in vector_query.get()]
+        except Exception as e:
+            if not goal_filter:
+                raise
+            if isinstance(e, gcp_exceptions.FailedPrecondition):
+                # Missing index: don't pay for a failing RPC on every filtered search
+                self._goal_prefilter_enabled = False
+                logger.warning("Goal vector index missing (deploy firestore.indexes.json); "
+                               "searching unfiltered: %s", e)
+            else:
+                logger.warning("Goal pre-filtered vector search failed, falling back to unfiltered: %s", e)
+            return self._vector_search(collection_ref, query_embedding, limit=limit)
 
     def _format_search_result(self, data):
         """Format a raw Firestore doc dict into a search result."""
@@ -1373,10 +1562,11 @@ class LibrarianAgent:
             if count > 0:
                 batch.commit()
                 
-            logger.info(f"Deleted video {video_id} from Firestore")
+            self._invalidate_video(self._normalize_original_video_id(video_id))
+            logger.info("Deleted video %s from Firestore", video_id)
             return True
         except Exception as e:
-            logger.error(f"Failed to delete video {video_id}: {str(e)}")
+            logger.error("Failed to delete video %s: %s", video_id, e)
             return False
 
     def get_stats(self):
@@ -1424,7 +1614,7 @@ class LibrarianAgent:
 
             return result
         except Exception as e:
-            logger.error(f"Chat failed: {e}")
+            logger.error("Chat failed: %s", e)
             return {
                 "answer": "Error processing chat via LangGraph.",
                 "sources": [],
@@ -1506,8 +1696,8 @@ class LibrarianAgent:
             tier3_chunks.extend(sub_chunks)
 
         logger.info(
-            f"Hierarchical chunking: {len(tier2_chunks)} Tier-2 (~{tier2_window}s), "
-            f"{len(tier3_chunks)} Tier-3 (~{tier3_window}s, {tier3_overlap}s overlap)"
+            "Hierarchical chunking: %s Tier-2 (~%ss), %s Tier-3 (~%ss, %ss overlap)",
+            len(tier2_chunks), tier2_window, len(tier3_chunks), tier3_window, tier3_overlap
         )
         return tier2_chunks, tier3_chunks
 
@@ -1557,8 +1747,11 @@ class LibrarianAgent:
 
 # Singleton
 _librarian_instance = None
+_librarian_lock = threading.Lock()
 def get_librarian_agent():
     global _librarian_instance
     if _librarian_instance is None:
-        _librarian_instance = LibrarianAgent()
+        with _librarian_lock:
+            if _librarian_instance is None:
+                _librarian_instance = LibrarianAgent()
     return _librarian_instance
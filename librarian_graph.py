@@ -35,7 +35,7 @@ class LibrarianGraph:
         """Retrieve documents from Firestore via LibrarianAgent using cascading multi-tier search."""
         query = state['query']
         focus_video_id = state.get('focus_video_id') or ""
-        logger.info(f"LangGraph Retrieve: {query} (focus: {focus_video_id or 'none'})")
+        logger.info("LangGraph Retrieve: %s (focus: %s)", query, focus_video_id or 'none')
 
         # Multi-tier retrieval: passes focus_video_id for optimized search
         search_res = self.agent.search_history(
@@ -261,7 +261,7 @@ Inventory Highlights:
             response = self.model.invoke(messages)
             return {"answer": response.content, "sources": sources}
         except Exception as e:
-            logger.error(f"Generation failed: {e}")
+            logger.error("Generation failed: %s", e)
             return {"answer": "Sorry, I encountered an error generating the response.", "sources": []}
 
     def _build_graph(self):
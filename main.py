@@ -1,6 +1,6 @@
 from youtube_api import fetch_video_details
-from scoring_modules import score_description, score_title, score_tags, score_category
-from data_manager import save_feedback, load_feedback
+from scoring_modules import score_all
+from data_manager import save_feedback, load_feedback_arrays
 from model_trainer import train_and_save_model, load_model
 import numpy as np
 
@@ -18,11 +18,12 @@ def main():
     print(f"Tags: {', '.join(details['tags']) if details['tags'] else '(none)'}")
     print(f"Description: {details['description'][:120]}{'...' if len(details['description']) > 120 else ''}")
 
-    # Compute scores
-    desc_score = score_description(goal, details['title'], details['description'])
-    title_score = score_title(goal, details['title'])
-    tags_score = score_tags(goal, details['tags'])
-    category_score = score_category(goal, details['category'])
+    # Compute scores (one model call for all four)
+    scores = score_all(goal, details)
+    desc_score = scores['description']
+    title_score = scores['title']
+    tags_score = scores['tags']
+    category_score = scores['category']
     features = np.array([[desc_score, title_score, tags_score, category_score]])
 
     # Predict final score
@@ -38,14 +39,12 @@ def main():
     save_feedback(desc_score, title_score, tags_score, category_score, user_score)
 
     # Retrain if enough feedback
-    feedback = load_feedback()
-    if len(feedback) >= MIN_FEEDBACK:
-        X = np.array([[float(row['desc_score']), float(row['title_score']), float(row['tags_score']), float(row['category_score'])] for row in feedback])
-        y = np.array([float(row['user_score']) for row in feedback])
+    X, y = load_feedback_arrays()
+    if len(y) >= MIN_FEEDBACK:
         train_and_save_model(X, y)
         print('Model retrained with new feedback!')
     else:
-        print(f'Not enough feedback to retrain (need {MIN_FEEDBACK}, have {len(feedback)})')
+        print(f'Not enough feedback to retrain (need {MIN_FEEDBACK}, have {len(y)})')
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
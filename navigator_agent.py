@@ -26,12 +26,12 @@ class NavigatorAgent:
         self.model_name = 'gemini-2.0-flash'
         if GOOGLE_API_KEY:
             try:
-                from google import genai
-                self.client = genai.Client(api_key=GOOGLE_API_KEY)
+                from gemini_client import get_gemini_client
+                self.client = get_gemini_client()
             except ImportError:
                 logger.error("Failed to import google.genai. Install 'google-genai' package.")
             except Exception as e:
-                logger.error(f"Failed to initialize Navigator client: {e}")
+                logger.error("Failed to initialize Navigator client: %s", e)
                 
         logger.info("Navigator Agent initialized")
 
@@ -51,11 +51,11 @@ class NavigatorAgent:
         """
         try:
             # 1. Try to extract from comments first (Fast, Free, Human-Verified)
-            logger.info(f"Navigator looking for timestamps in comments for {video_id}...")
+            logger.info("Navigator looking for timestamps in comments for %s...", video_id)
             comment_chapters = self._extract_from_comments(video_id)
             
             if comment_chapters:
-                logger.info(f"Found {len(comment_chapters)} chapters in comments for {video_id}")
+                logger.info("Found %s chapters in comments for %s", len(comment_chapters), video_id)
                 return {
                     'source': 'comments',
                     'chapters': comment_chapters,
@@ -63,7 +63,7 @@ class NavigatorAgent:
                 }
             
             # 2. Fallback to AI Generation from Transcript
-            logger.info(f"No chapters in comments. Generating from transcript for {video_id}...")
+            logger.info("No chapters in comments. Generating from transcript for %s...", video_id)
             ai_chapters = self._generate_from_transcript(video_id)
             
             if ai_chapters:
@@ -80,7 +80,7 @@ class NavigatorAgent:
             }
 
         except Exception as e:
-            logger.error(f"Navigator failed for {video_id}: {str(e)}")
+            logger.error("Navigator failed for %s: %s", video_id, e)
             return {
                 'source': 'error',
                 'chapters': [],
@@ -122,7 +122,7 @@ class NavigatorAgent:
             return best_chapter_list if best_chapter_list else None
 
         except Exception as e:
-            logger.error(f"Error extracting comment timestamps: {e}")
+            logger.error("Error extracting comment timestamps: %s", e)
             return None
 
     def _generate_from_transcript(self, video_id):
@@ -137,7 +137,7 @@ class NavigatorAgent:
             transcript_text = transcript_data.get('transcript')
             
             if not transcript_text:
-                logger.warning(f"No transcript available for {video_id}")
+                logger.warning("No transcript available for %s", video_id)
                 return None
                 
             # Truncate if too long (approx 1 hour of video is fine, but super long streams might hit token limits)
@@ -218,7 +218,7 @@ JSON FORMAT:
             return json.loads(text)
 
         except Exception as e:
-            logger.error(f"Error generating chapters with Gemini: {e}")
+            logger.error("Error generating chapters with Gemini: %s", e)
             return None
 
 # Global Instance
@@ -16,4 +16,5 @@ source venv/bin/activate
 echo "Server will be available at: http://localhost:8080"
 echo "Press Ctrl+C to stop the server"
 echo ""
-python3 api.py
+# Threaded gunicorn workers (gunicorn.conf.py) instead of the Flask dev server
+exec gunicorn api:app
@@ -1,8 +1,10 @@
-from google import genai
 import logging
-import json
 import os
+import re
+
+import orjson
 from config import Config
+from gemini_client import get_gemini_client
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -12,28 +14,34 @@ logger = logging.getLogger(__name__)
 # if Config.GOOGLE_API_KEY:
 #    genai.configure(api_key=Config.GOOGLE_API_KEY)
 
+SCORE_FIELDS = ('description', 'title', 'tags', 'category')
+
+# Leading/trailing Markdown code fences Gemini sometimes wraps its JSON in
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$')
+
+def _get_genai_json(prompt):
+    """Run prompt through Gemini and parse its JSON reply (raises on failure)."""
+    client = get_gemini_client()
+    response = client.models.generate_content(
+        model='gemini-2.0-flash',
+        contents=prompt,
+        config={
+            'response_mime_type': 'application/json'
+        }
+    )
+    return orjson.loads(_FENCE_RE.sub('', response.text))
+
 def _get_genai_score(prompt):
     if not Config.GOOGLE_API_KEY:
         logger.error("Missing GOOGLE_API_KEY")
         return 0.0
 
     try:
-        client = genai.Client(api_key=Config.GOOGLE_API_KEY)
-        response = client.models.generate_content(
-            model='gemini-2.0-flash',
-            contents=prompt
-        )
-        text = response.text.strip()
-        if text.startswith('```json'): # Cleanup
-            text = text.replace('```json', '').replace('```', '')
-        elif text.startswith('```'):
-            text = text.replace('```', '')
-            
-        data = json.loads(text)
+        data = _get_genai_json(prompt)
         # Normalize 0-100 to 0.0-1.0 as expected by detailed endpoints
         return float(data.get('score', 0)) / 100.0
     except Exception as e:
-        logger.error(f"GenAI Detailed Scoring Error: {e}")
+        logger.error("GenAI Detailed Scoring Error: %s", e)
         return 0.0
 
 # --- 1. Description Scoring ---
@@ -80,4 +88,32 @@ User Goal: {goal}
 Output JSON only with a score 0-100:
 {{ "score": <0-100> }}
 """
-    return _get_genai_score(prompt)
\ No newline at end of file
+    return _get_genai_score(prompt)
+
+# --- All four in one call ---
+def score_all(goal, details):
+    """
+    Score description, title, tags and category with a single Gemini call
+    instead of one per field. Returns {field: 0.0-1.0} for SCORE_FIELDS.
+    """
+    if not Config.GOOGLE_API_KEY:
+        logger.error("Missing GOOGLE_API_KEY")
+        return dict.fromkeys(SCORE_FIELDS, 0.0)
+
+    tags_str = ", ".join((details.get('tags') or [])[:20])
+    prompt = f"""Rate the relevance of each part of this video to the user's goal.
+Title: {details.get('title', '')}
+Description: {(details.get('description') or '')[:2000]}
+Tags: {tags_str}
+Category: {details.get('category', '')}
+User Goal: {goal}
+
+Output JSON only with a score 0-100 for each part:
+{{ "description": <0-100>, "title": <0-100>, "tags": <0-100>, "category": <0-100> }}
+"""
+    try:
+        data = _get_genai_json(prompt)
+        return {field: float(data.get(field, 0)) / 100.0 for field in SCORE_FIELDS}
+    except Exception as e:
+        logger.error("GenAI Detailed Scoring Error: %s", e)
+        return dict.fromkeys(SCORE_FIELDS, 0.0)
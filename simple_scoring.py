@@ -1,9 +1,9 @@
 import os
-from google import genai
 import logging
 import json
 import re
 from youtube_client import get_video_details
+from gemini_client import get_gemini_client
 from config import Config
 
 # Setup logging
@@ -51,32 +51,37 @@ Respond with valid JSON only:
 }}
 """
 
+# Post-processing vocabularies (built once, not per scored video)
+_TOKEN_SPLIT_RE = re.compile(r'[^a-z0-9]+')
+_AI_ML_GOAL_KEYWORDS = (
+    'deep learning', 'machine learning', 'ml', 'artificial intelligence', 'ai',
+    'llm', 'transformer', 'neural network', 'interview'
+)
+_AI_ML_TOPIC_KEYWORDS = (
+    'kv cache', 'key value cache', 'transformer', 'attention', 'llm',
+    'inference', 'token', 'decoder', 'prompt caching', 'rag',
+    'embedding', 'fine tuning', 'quantization', 'neural network', 'deep learning'
+)
+_OVERLAP_STOPWORDS = frozenset({
+    'the', 'and', 'for', 'with', 'from', 'that', 'this', 'what', 'when', 'where',
+    'why', 'how', 'learn', 'learning', 'video', 'videos', 'about', 'into'
+})
+# 10=Music, 20=Gaming, 23=Comedy, 24=Entertainment
+BANNED_CATEGORIES = frozenset({'10', '20', '23', '24'})
+
 def _normalize_tokens(text: str) -> list:
-    return [t for t in re.split(r'[^a-z0-9]+', (text or '').lower()) if len(t) > 2]
+    return [t for t in _TOKEN_SPLIT_RE.split((text or '').lower()) if len(t) > 2]
 
 def _is_ai_ml_goal(goal: str) -> bool:
     goal_text = (goal or '').lower()
-    keywords = [
-        'deep learning', 'machine learning', 'ml', 'artificial intelligence', 'ai',
-        'llm', 'transformer', 'neural network', 'interview'
-    ]
-    return any(k in goal_text for k in keywords)
+    return any(k in goal_text for k in _AI_ML_GOAL_KEYWORDS)
 
 def _is_ai_ml_video_topic(title: str, description: str, transcript: str = '') -> bool:
     text = f"{title} {description} {transcript[:2000]}".lower()
-    keywords = [
-        'kv cache', 'key value cache', 'transformer', 'attention', 'llm',
-        'inference', 'token', 'decoder', 'prompt caching', 'rag',
-        'embedding', 'fine tuning', 'quantization', 'neural network', 'deep learning'
-    ]
-    return any(k in text for k in keywords)
+    return any(k in text for k in _AI_ML_TOPIC_KEYWORDS)
 
 def _goal_overlap_ratio(goal: str, title: str, description: str) -> float:
-    stopwords = {
-        'the', 'and', 'for', 'with', 'from', 'that', 'this', 'what', 'when', 'where',
-        'why', 'how', 'learn', 'learning', 'video', 'videos', 'about', 'into'
-    }
-    goal_tokens = [t for t in _normalize_tokens(goal) if t not in stopwords]
+    goal_tokens = [t for t in _normalize_tokens(goal) if t not in _OVERLAP_STOPWORDS]
     if not goal_tokens:
         return 0.0
     video_tokens = set(_normalize_tokens(f"{title} {description[:1200]}"))
@@ -139,8 +144,6 @@ def compute_simple_score(video_url: str, goal: str, transcript: str = "", intent
         return 0, f"Blocked Channel: {channel_title}", {'status': 'blocked', 'reason': 'channel_block'}
 
     # Category Block
-    # 10=Music, 20=Gaming, 23=Comedy, 24=Entertainment
-    BANNED_CATEGORIES = ['10', '20', '23', '24']
     ignored_categories = set(BANNED_CATEGORIES)
     
     if intent:
@@ -173,8 +176,7 @@ def compute_simple_score(video_url: str, goal: str, transcript: str = "", intent
         current_key = Config.GOOGLE_API_KEY or 'NONE'
         logger.info(f"DEBUG: Using Google API Key: {current_key[:10]}..." if current_key != 'NONE' else "DEBUG: No API key configured")
         
-        client = genai.Client(api_key=Config.GOOGLE_API_KEY)
-        client = genai.Client(api_key=Config.GOOGLE_API_KEY)
+        client = get_gemini_client()
         prompt = _get_scoring_prompt(title, description, goal, intent, transcript)
         
         response = client.models.generate_content(
@@ -201,7 +203,7 @@ def compute_simple_score(video_url: str, goal: str, transcript: str = "", intent
             transcript=transcript
         )
         
-        logger.info(f"Scored {video_url} against '{goal}': {score} (Reason: {reasoning})")
+        logger.info("Scored %s against '%s': %s (Reason: %s)", video_url, goal, score, reasoning)
         debug_info['gemini_api']['status'] = 'success'
         debug_info['gemini_api']['raw_response'] = text_response
         debug_info['post_processing'] = score_adjustment_info
@@ -211,7 +213,7 @@ def compute_simple_score(video_url: str, goal: str, transcript: str = "", intent
     except Exception as e:
         debug_info['gemini_api']['status'] = 'failed'
         debug_info['gemini_api']['error'] = str(e)
-        logger.error(f"GenAI Scoring failed: {e}")
+        logger.error("GenAI Scoring failed: %s", e)
         # Attach debug info to exception so api.py can retrieve it
         e.debug_info = debug_info
         raise e
@@ -81,4 +81,6 @@ echo "Press Ctrl+C to stop the server"
 echo "========================================"
 echo ""
 
-python3 api.py
+# Threaded gunicorn workers (gunicorn.conf.py) so slow YouTube/Gemini calls
+# do not hold up other requests
+exec gunicorn api:app
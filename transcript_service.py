@@ -10,20 +10,25 @@ logger = logging.getLogger(__name__)
 # Layer 4: Transcript Cache — avoids re-fetching from YouTube API
 _transcript_cache = {}  # {video_id: (result_dict, timestamp)}
 _TRANSCRIPT_CACHE_TTL = 1800  # 30 minutes
+_TRANSCRIPT_CACHE_MAX_SIZE = 256  # full transcripts are large; keep the newest
 
 def _get_cached_transcript(video_id):
     """Return cached transcript if available and fresh."""
     if video_id in _transcript_cache:
         result, ts = _transcript_cache[video_id]
         if time.time() - ts < _TRANSCRIPT_CACHE_TTL:
-            logger.info(f"Transcript cache hit for {video_id}")
+            logger.info("Transcript cache hit for %s", video_id)
             return result
-        del _transcript_cache[video_id]
+        _transcript_cache.pop(video_id, None)
     return None
 
 def _cache_transcript(video_id, result):
     """Store transcript result in cache."""
+    _transcript_cache.pop(video_id, None)
     _transcript_cache[video_id] = (result, time.time())
+    # Dicts keep insertion order, so the first key is the oldest entry
+    while len(_transcript_cache) > _TRANSCRIPT_CACHE_MAX_SIZE:
+        _transcript_cache.pop(next(iter(_transcript_cache)), None)
 
 def extract_video_id(url_or_id):
     """Extract video ID from URL or return ID if already extracted."""
@@ -83,7 +88,7 @@ def get_transcript(video_id, languages=['en', 'en-US', 'en-GB']):
         # We assume first language in the list
         language = languages[0] if languages else 'en'
         
-        logger.info(f"Successfully fetched transcript for {video_id}")
+        logger.info("Successfully fetched transcript for %s", video_id)
         
         result = {
             'transcript': full_text,
@@ -96,7 +101,7 @@ def get_transcript(video_id, languages=['en', 'en-US', 'en-GB']):
         return result
         
     except TranscriptsDisabled:
-        logger.error(f"Transcripts are disabled for video {video_id}")
+        logger.error("Transcripts are disabled for video %s", video_id)
         return {
             'transcript': None,
             'segments': [],
@@ -106,22 +111,24 @@ def get_transcript(video_id, languages=['en', 'en-US', 'en-GB']):
         }
         
     except NoTranscriptFound:
-        logger.warning(f"No transcript found for video {video_id} in languages {languages}")
+        logger.warning("No transcript found for video %s in languages %s", video_id, languages)
         # Try without language restriction as fallback
         try:
-            logger.info(f"Trying to fetch any available transcript for {video_id}")
+            logger.info("Trying to fetch any available transcript for %s", video_id)
             segments = YouTubeTranscriptApi.get_transcript(video_id)
             full_text = ' '.join([segment['text'] for segment in segments])
             
-            return {
+            result = {
                 'transcript': full_text,
                 'segments': segments,
                 'language': 'unknown',
                 'is_generated': None,
                 'error': None
             }
+            _cache_transcript(video_id, result)
+            return result
         except Exception as e:
-            logger.error(f"Failed to get any transcript for {video_id}: {str(e)}")
+            logger.error("Failed to get any transcript for %s: %s", video_id, e)
             return {
                 'transcript': None,
                 'segments': [],
@@ -131,7 +138,7 @@ def get_transcript(video_id, languages=['en', 'en-US', 'en-GB']):
             }
             
     except VideoUnavailable:
-        logger.error(f"Video {video_id} is unavailable")
+        logger.error("Video %s is unavailable", video_id)
         return {
             'transcript': None,
             'segments': [],
@@ -141,7 +148,7 @@ def get_transcript(video_id, languages=['en', 'en-US', 'en-GB']):
         }
         
     except Exception as e:
-        logger.error(f"Error fetching transcript for {video_id}: {str(e)}")
+        logger.error("Error fetching transcript for %s: %s", video_id, e)
         return {
             'transcript': None,
             'segments': [],
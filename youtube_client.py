@@ -1,12 +1,66 @@
 import os
 import re
 import json
+import threading
+import time
+from collections import OrderedDict
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import Config
 
 YOUTUBE_VIDEO_URL = 'https://www.googleapis.com/youtube/v3/videos'
 YOUTUBE_CATEGORY_URL = 'https://www.googleapis.com/youtube/v3/videoCategories'
 YOUTUBE_COMMENT_THREADS_URL = 'https://www.googleapis.com/youtube/v3/commentThreads'
+REQUEST_TIMEOUT = 10  # seconds
+
+# In-process caches so repeat lookups skip the quota-limited Data API
+VIDEO_DETAILS_CACHE_TTL = 3600  # 1 hour
+VIDEO_NOT_FOUND_CACHE_TTL = 120  # short, so a video that becomes public is picked up
+VIDEO_DETAILS_CACHE_MAX_SIZE = 4096
+CATEGORY_CACHE_TTL = 86400  # category names effectively never change
+
+def _build_session() -> requests.Session:
+    """
+    Shared session so YouTube calls reuse pooled keep-alive connections
+    instead of paying a TCP+TLS handshake per request.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=64,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504), allowed_methods=('GET',))
+    )
+    session.mount('https://', adapter)
+    return session
+
+_session = _build_session()
+
+_details_cache = OrderedDict()  # {video_id: (details_or_None, expires_at)}
+_category_cache = {}  # {category_id: (name, expires_at)}
+_cache_lock = threading.Lock()
+
+def _get_cached(cache, key):
+    """Return (hit, value) for a fresh entry; expired entries are dropped."""
+    with _cache_lock:
+        entry = cache.get(key)
+        if entry is None:
+            return False, None
+        value, expires_at = entry
+        if time.time() >= expires_at:
+            del cache[key]
+            return False, None
+        if isinstance(cache, OrderedDict):
+            cache.move_to_end(key)
+        return True, value
+
+def _set_cached(cache, key, value, ttl, max_size=None):
+    with _cache_lock:
+        cache[key] = (value, time.time() + ttl)
+        if max_size is not None:
+            cache.move_to_end(key)
+            while len(cache) > max_size:
+                cache.popitem(last=False)
 
 def extract_video_id(url_or_id: str) -> str:
     """
@@ -24,17 +78,23 @@ def extract_video_id(url_or_id: str) -> str:
 
 def get_video_details(video_url_or_id: str):
     video_id = extract_video_id(video_url_or_id)
-    
-    # Direct API fetch - No caching (Redis removed)
+
+    hit, details = _get_cached(_details_cache, video_id)
+    if hit:
+        return details
+
     print(f"Fetching video details from API for {video_id}")
     params = {
         'part': 'snippet',
         'id': video_id,
         'key': Config.YOUTUBE_API_KEY
     }
-    resp = requests.get(YOUTUBE_VIDEO_URL, params=params)
+    resp = _session.get(YOUTUBE_VIDEO_URL, params=params, timeout=REQUEST_TIMEOUT)
     data = resp.json()
     if not data.get('items') or not data['items'][0]:
+        # Only a successful lookup that found nothing is cached, not API errors
+        if resp.ok:
+            _set_cached(_details_cache, video_id, None, VIDEO_NOT_FOUND_CACHE_TTL, VIDEO_DETAILS_CACHE_MAX_SIZE)
         return None
     snippet = data['items'][0]['snippet']
     category_id = snippet.get('categoryId', '')
@@ -46,22 +106,27 @@ def get_video_details(video_url_or_id: str):
         'category': category_name
     }
 
+    _set_cached(_details_cache, video_id, details, VIDEO_DETAILS_CACHE_TTL, VIDEO_DETAILS_CACHE_MAX_SIZE)
     return details
 
 def get_category_name(category_id: str):
-    # Direct API fetch - No caching (Redis removed)
+    hit, category_name = _get_cached(_category_cache, category_id)
+    if hit:
+        return category_name
+
     print(f"Fetching category name from API for {category_id}")
     params = {
         'part': 'snippet',
         'id': category_id,
         'key': Config.YOUTUBE_API_KEY
     }
-    resp = requests.get(YOUTUBE_CATEGORY_URL, params=params)
+    resp = _session.get(YOUTUBE_CATEGORY_URL, params=params, timeout=REQUEST_TIMEOUT)
     data = resp.json()
     if not data.get('items') or not data['items'][0]:
         return ''
     category_name = data['items'][0]['snippet']['title']
 
+    _set_cached(_category_cache, category_id, category_name, CATEGORY_CACHE_TTL)
     return category_name
 
 def get_video_comments(video_url_or_id: str, max_results: int = 20):
@@ -82,7 +147,7 @@ def get_video_comments(video_url_or_id: str, max_results: int = 20):
             'key': Config.YOUTUBE_API_KEY
         }
         
-        resp = requests.get(YOUTUBE_COMMENT_THREADS_URL, params=params)
+        resp = _session.get(YOUTUBE_COMMENT_THREADS_URL, params=params, timeout=REQUEST_TIMEOUT)
         
         if resp.status_code != 200:
             print(f"Error fetching comments: {resp.status_code} - {resp.text}")